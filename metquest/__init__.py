@@ -3,8 +3,11 @@ from .fetch_reactions import *
 from .generate_partitions import *
 from .get_reaction_types import *
 from .guided_bfs import *
-from .pathway_assembler import find_pathways
-from .construct_graph import create_graph
+from .pathway_assembler import find_pathways, resume_pathways, count_pathways, iter_pathways, \
+    count_partition_combinations, find_k_shortest_pathways, PathwayAssembler
+from .construct_graph import create_graph, iter_graphs, prune_graph
+from .compiled_graph import CompiledGraph, compile_graph
+from .table_store import MemoryTableStore, SQLiteTableStore
 from .package_data import __version__
 from .example.run_this_example import *
 from .find_transport_rxns import *
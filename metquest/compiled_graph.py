@@ -0,0 +1,269 @@
+# -*- coding: utf-8 -*-
+
+from __future__ import absolute_import
+
+import numpy as np
+import networkx as nx
+
+
+class CompiledGraph(object):
+    """
+    Compact, integer indexed form of the bipartite graph of the metabolic
+    network. Every node is interned to an integer identifier and the
+    predecessors and successors of the nodes are stored as compressed sparse
+    row (CSR) arrays. The functions which walk the graph (forward_pass,
+    find_pathways and the functions writing the results) accept this object
+    in place of the NetworkX DiGraph.
+
+    Parameters
+    ----------
+    names : list
+        Names of the nodes, the position of a name being its identifier
+    bipartite : numpy array
+        Array which is 1 for reaction nodes and 0 for metabolite nodes
+    pred_indptr : numpy array
+        Start and end positions of the predecessors of every node in
+        pred_indices
+    pred_indices : numpy array
+        Identifiers of the predecessors of the nodes
+    succ_indptr : numpy array
+        Start and end positions of the successors of every node in
+        succ_indices
+    succ_indices : numpy array
+        Identifiers of the successors of the nodes
+
+    Notes
+    -----
+    The predecessors and successors of every node are stored in the same
+    order as in the DiGraph from which the object has been compiled, so
+    that the traversals visit the nodes in the same order.
+
+    predecessors and successors look up the CSR arrays and return the names
+    of the neighbours for every call, without keeping them, so that only
+    the CSR arrays are held. The traversals which visit the nodes many
+    times use the integer identifiers given by id_adjacency, and the other
+    functions only ask for the neighbours of a node once or when writing
+    the results.
+    """
+
+    def __init__(self, names, bipartite, pred_indptr, pred_indices,
+                 succ_indptr, succ_indices):
+        self.names = list(names)
+        self.node_ids = {name: idx for idx, name in enumerate(self.names)}
+        self.bipartite = bipartite
+        self.pred_indptr = pred_indptr
+        self.pred_indices = pred_indices
+        self.succ_indptr = succ_indptr
+        self.succ_indices = succ_indices
+
+    def __contains__(self, node):
+        return node in self.node_ids
+
+    def __iter__(self):
+        return iter(self.names)
+
+    def __len__(self):
+        return len(self.names)
+
+    def __str__(self):
+        return 'CompiledGraph with %d nodes and %d edges' % (
+            self.number_of_nodes(), self.number_of_edges())
+
+    def nodes(self):
+        """Returns the list of node names"""
+        return list(self.names)
+
+    def edges(self):
+        """Yields all the edges of the graph as pairs of node names"""
+        names = self.names
+        indptr = self.succ_indptr.tolist()
+        indices = self.succ_indices.tolist()
+        for nodeid, name in enumerate(names):
+            for succid in indices[indptr[nodeid]:indptr[nodeid + 1]]:
+                yield name, names[succid]
+
+    def number_of_nodes(self):
+        return len(self.names)
+
+    def number_of_edges(self):
+        return len(self.succ_indices)
+
+    def predecessors(self, node):
+        """Returns the list of the names of the predecessors of a node"""
+        return self._neighbour_names(self.pred_indptr, self.pred_indices, node)
+
+    def successors(self, node):
+        """Returns the list of the names of the successors of a node"""
+        return self._neighbour_names(self.succ_indptr, self.succ_indices, node)
+
+    def _neighbour_names(self, indptr, indices, node):
+        """
+        Returns the names of the neighbours of a node, from the CSR arrays
+        of the predecessors or the successors
+        """
+        names = self.names
+        nodeid = self.node_ids[node]
+        return [names[neighbourid] for neighbourid in
+                indices[indptr[nodeid]:indptr[nodeid + 1]].tolist()]
+
+    def reactions(self):
+        """Returns the names of the reaction nodes"""
+        names = self.names
+        return [names[nodeid] for nodeid in
+                np.flatnonzero(self.bipartite == 1).tolist()]
+
+    def without_nodes(self, nodes):
+        """
+        Returns a new compiled graph from which the given nodes and their
+        edges have been removed. The remaining nodes keep their order.
+
+        Parameters
+        ----------
+        nodes : iterable
+            Names of the nodes to be removed
+
+        Returns
+        -------
+        compiled_graph : CompiledGraph
+            Bipartite graph without the given nodes
+        """
+        keep = np.ones(len(self.names), dtype=bool)
+        for node in nodes:
+            if node in self.node_ids:
+                keep[self.node_ids[node]] = False
+        new_ids = np.cumsum(keep) - 1
+        names = [self.names[nodeid] for nodeid in np.flatnonzero(keep).tolist()]
+        pred_indptr, pred_indices = _filter_csr(
+            self.pred_indptr, self.pred_indices, keep, new_ids)
+        succ_indptr, succ_indices = _filter_csr(
+            self.succ_indptr, self.succ_indices, keep, new_ids)
+        return CompiledGraph(names, self.bipartite[keep], pred_indptr,
+                             pred_indices, succ_indptr, succ_indices)
+
+    def id_adjacency(self):
+        """
+        Returns functions giving the identifiers of the predecessors and
+        the successors of a node identifier. The CSR arrays are converted to
+        lists once, since indexing lists is faster than indexing numpy arrays
+        from Python code.
+
+        Returns
+        -------
+        pred : function
+            Predecessors of a node identifier
+        succ : function
+            Successors of a node identifier
+        """
+        pred_indptr = self.pred_indptr.tolist()
+        pred_indices = self.pred_indices.tolist()
+        succ_indptr = self.succ_indptr.tolist()
+        succ_indices = self.succ_indices.tolist()
+
+        def pred(nodeid):
+            return pred_indices[pred_indptr[nodeid]:pred_indptr[nodeid + 1]]
+
+        def succ(nodeid):
+            return succ_indices[succ_indptr[nodeid]:succ_indptr[nodeid + 1]]
+        return pred, succ
+
+    def to_networkx(self):
+        """
+        Returns the NetworkX DiGraph corresponding to the compiled graph
+
+        Returns
+        -------
+        G : NetworkX DiGraph Object
+            Bipartite graph of the metabolic network
+        """
+        G = nx.DiGraph()
+        bipartite = self.bipartite.tolist()
+        G.add_nodes_from((name, {'bipartite': bipartite[nodeid]})
+                         for nodeid, name in enumerate(self.names))
+        G.add_edges_from(self.edges())
+        return G
+
+
+def compile_graph(G):
+    """
+    This function converts the bipartite NetworkX DiGraph of the metabolic
+    network into its compact, integer indexed form.
+
+    Parameters
+    ----------
+    G : NetworkX DiGraph Object
+        Bipartite graph of the metabolic network
+
+    Returns
+    -------
+    compiled_graph : CompiledGraph
+        Bipartite graph with the nodes interned to integers and the
+        adjacency stored as CSR arrays
+    """
+    names = list(G.nodes())
+    node_ids = {name: idx for idx, name in enumerate(names)}
+    bipartite = np.array([G.nodes[name].get('bipartite', 0) for name in names],
+                         dtype=np.int8)
+    pred_indptr, pred_indices = _adjacency_to_csr(names, node_ids, G.predecessors)
+    succ_indptr, succ_indices = _adjacency_to_csr(names, node_ids, G.successors)
+    return CompiledGraph(names, bipartite, pred_indptr, pred_indices,
+                         succ_indptr, succ_indices)
+
+
+def _adjacency_to_csr(names, node_ids, neighbours):
+    """
+    This function stores the neighbours of every node as CSR arrays.
+
+    Parameters
+    ----------
+    names : list
+        Names of the nodes in the order of their identifiers
+    node_ids : dict
+        Dictionary mapping the names of the nodes to their identifiers
+    neighbours : function
+        Function returning the neighbours (predecessors or successors)
+        of a node
+
+    Returns
+    -------
+    indptr : numpy array
+        Start and end positions of the neighbours of every node in indices
+    indices : numpy array
+        Identifiers of the neighbours of the nodes
+    """
+    indptr = np.zeros(len(names) + 1, dtype=np.int64)
+    indices = []
+    for nodeid, name in enumerate(names):
+        indices.extend(node_ids[neighbour] for neighbour in neighbours(name))
+        indptr[nodeid + 1] = len(indices)
+    return indptr, np.array(indices, dtype=np.int32)
+
+
+def _filter_csr(indptr, indices, keep, new_ids):
+    """
+    This function removes the rows and the entries of the nodes which are
+    not kept from CSR arrays, and renumbers the remaining entries.
+
+    Parameters
+    ----------
+    indptr : numpy array
+        Start and end positions of the neighbours of every node in indices
+    indices : numpy array
+        Identifiers of the neighbours of the nodes
+    keep : numpy array
+        Boolean array which is True for the nodes that are kept
+    new_ids : numpy array
+        New identifiers of the nodes that are kept
+
+    Returns
+    -------
+    indptr : numpy array
+        Start and end positions of the neighbours of every kept node
+    indices : numpy array
+        New identifiers of the neighbours of the kept nodes
+    """
+    row_of_entry = np.repeat(np.arange(len(keep)), np.diff(indptr))
+    entry_kept = keep[row_of_entry] & keep[indices]
+    counts = np.bincount(row_of_entry[entry_kept], minlength=len(keep))[keep]
+    new_indptr = np.zeros(len(counts) + 1, dtype=np.int64)
+    np.cumsum(counts, out=new_indptr[1:])
+    return new_indptr, new_ids[indices[entry_kept]].astype(np.int32)
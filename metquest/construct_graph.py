@@ -5,12 +5,16 @@ from __future__ import absolute_import
 import os
 import itertools
 import sys
+from collections import ChainMap
 from pickle import dump
 import networkx as nx
 from metquest import fetch_reactions
+from metquest import graph_cache
+from metquest.compiled_graph import CompiledGraph, compile_graph
+from metquest.guided_bfs import forward_pass
 
 
-def _create_graph_with_internal_reaction(organismsdata):
+def _create_graph_with_internal_reaction(organismsdata, internal_layers=None):
     """
     This function creates a NetworkX DiGraph object which consists of
     reactions and metabolites happening inside the organisms in a community.
@@ -21,60 +25,88 @@ def _create_graph_with_internal_reaction(organismsdata):
     ----------
     organismsdata : dict
         Dictionary containing the reaction information about organisms
+    internal_layers : dict
+        Dictionary mapping the organisms to the lists of nodes and edges of
+        their internal reactions (see _internal_nodes_and_edges), which is
+        filled with the organisms that are not in it. If given, the lists of
+        every organism are only made once for all the graphs of the
+        combinations of organisms
 
     Returns
     -------
     G : NetworkX DiGraph Object
         Bipartite graph consisting of internal reactions in organisms
+
+    Notes
+    -----
+    The nodes and the edges of all the organisms are collected in lists
+    (see _internal_nodes_and_edges) and added to the graph at once.
     """
-    G = nx.DiGraph()
+    if internal_layers is None:
+        internal_layers = {}
+    all_nodes = []
+    all_edges = []
     for modelname in organismsdata:
-        G.add_nodes_from(organismsdata[modelname]
-                         ['irreversible_rxn_no'], bipartite=1)
-        G.add_nodes_from(organismsdata[modelname]
-                         ['reversible_rxn_no'], bipartite=1)
-        G.add_nodes_from(organismsdata[modelname]
-                         ['reversible_back_rxn_no'], bipartite=1)
-        irrev_lhs_nodes = list(set(
-            [item for sublist in organismsdata[modelname]['irreversible_lhs_nodes']
-             for item in sublist]))
-        irrev_rhs_nodes = list(set(
-            [item for sublist in organismsdata[modelname]['irreversible_rhs_nodes']
-             for item in sublist]))
-        rev_lhs_nodes = list(set(
-            [item for sublist in organismsdata[modelname]['reversible_lhs_nodes']
-             for item in sublist]))
-        rev_rhs_nodes = list(set(
-            [item for sublist in organismsdata[modelname]['reversible_rhs_nodes']
-             for item in sublist]))
-        G.add_nodes_from(irrev_lhs_nodes, bipartite=0)
-        G.add_nodes_from(irrev_rhs_nodes, bipartite=0)
-        G.add_nodes_from(rev_lhs_nodes, bipartite=0)
-        G.add_nodes_from(rev_rhs_nodes, bipartite=0)
-        for irrevidx in range(len(organismsdata[modelname]['irreversible_rxn_no'])):
-            for lhsmetidx in range(len(organismsdata[modelname]['irreversible_lhs_nodes'][irrevidx])):
-                G.add_edges_from([(organismsdata[modelname]['irreversible_lhs_nodes'][irrevidx]
-                                   [lhsmetidx],
-                                   organismsdata[modelname]['irreversible_rxn_no'][irrevidx])])
-            for rhsmetidx in range(len(organismsdata[modelname]['irreversible_rhs_nodes'][irrevidx])):
-                G.add_edges_from([(organismsdata[modelname]['irreversible_rxn_no'][irrevidx],
-                                   organismsdata[modelname]['irreversible_rhs_nodes'][irrevidx][rhsmetidx])])
-        for revidx in range(len(organismsdata[modelname]['reversible_rxn_no'])):
-            for lhsmetidxrev in range(len(organismsdata[modelname]['reversible_lhs_nodes'][revidx])):
-                G.add_edges_from([(organismsdata[modelname]['reversible_lhs_nodes'][revidx]
-                                   [lhsmetidxrev],
-                                   organismsdata[modelname]['reversible_rxn_no'][revidx])])
-                G.add_edges_from([(organismsdata[modelname]['reversible_back_rxn_no'][revidx],
-                                   organismsdata[modelname]['reversible_lhs_nodes'][revidx][lhsmetidxrev])])
-            for rhsmetidxrev in range(len(organismsdata[modelname]['reversible_rhs_nodes'][revidx])):
-                G.add_edges_from([(organismsdata[modelname]['reversible_rxn_no'][revidx],
-                                   organismsdata[modelname]['reversible_rhs_nodes'][revidx][rhsmetidxrev])])
-                G.add_edges_from([(organismsdata[modelname]['reversible_rhs_nodes'][revidx]
-                                   [rhsmetidxrev],
-                                   organismsdata[modelname]['reversible_back_rxn_no'][revidx])])
+        if modelname not in internal_layers:
+            internal_layers[modelname] = _internal_nodes_and_edges(
+                organismsdata[modelname])
+        nodes, edges = internal_layers[modelname]
+        all_nodes.extend(nodes)
+        all_edges.extend(edges)
+    G = nx.DiGraph()
+    G.add_nodes_from(all_nodes)
+    G.add_edges_from(all_edges)
     return G
 
 
+def _internal_nodes_and_edges(organismdata):
+    """
+    This function lists the nodes and the edges of the internal reactions
+    of an organism, in the order in which they are added to the graph.
+
+    Parameters
+    ----------
+    organismdata : dict
+        Dictionary containing the reaction information about an organism
+
+    Returns
+    -------
+    nodes : list
+        List of pairs of the nodes and their attributes (bipartite is 1 for
+        the reactions and 0 for the metabolites)
+    edges : list
+        List of edges, from the metabolites required by every reaction to
+        the reaction, and from the reaction to the metabolites it produces
+    """
+    reaction_attributes = {'bipartite': 1}
+    metabolite_attributes = {'bipartite': 0}
+    nodes = []
+    for rxntype in ['irreversible_rxn_no', 'reversible_rxn_no',
+                    'reversible_back_rxn_no']:
+        nodes.extend((rxn, reaction_attributes) for rxn in organismdata[rxntype])
+    for mettype in ['irreversible_lhs_nodes', 'irreversible_rhs_nodes',
+                    'reversible_lhs_nodes', 'reversible_rhs_nodes']:
+        metabolites = list(set(
+            [item for sublist in organismdata[mettype] for item in sublist]))
+        nodes.extend((metab, metabolite_attributes) for metab in metabolites)
+    edges = []
+    for irrevrxn, lhsmets, rhsmets in zip(organismdata['irreversible_rxn_no'],
+                                          organismdata['irreversible_lhs_nodes'],
+                                          organismdata['irreversible_rhs_nodes']):
+        edges.extend((lhsmet, irrevrxn) for lhsmet in lhsmets)
+        edges.extend((irrevrxn, rhsmet) for rhsmet in rhsmets)
+    for revrxn, revbackrxn, lhsmets, rhsmets in zip(
+            organismdata['reversible_rxn_no'], organismdata['reversible_back_rxn_no'],
+            organismdata['reversible_lhs_nodes'], organismdata['reversible_rhs_nodes']):
+        for lhsmet in lhsmets:
+            edges.append((lhsmet, revrxn))
+            edges.append((revbackrxn, lhsmet))
+        for rhsmet in rhsmets:
+            edges.append((revrxn, rhsmet))
+            edges.append((rhsmet, revbackrxn))
+    return nodes, edges
+
+
 def _create_graph_with_exchange_reactions(G, orgs, namemap):
     """
     This function first identifies the common exchange metabolites
@@ -110,61 +142,80 @@ def _create_graph_with_exchange_reactions(G, orgs, namemap):
     common_exchange_metabolite = list(
         set.intersection(*list(map(set, metabolite_exchanged))))
     common_exchange_metabolite.sort()
+    nodes = []
+    edges = []
     #  Adding the common exchange metabolites to the graph
     for orgnames in orgs:
-        renamed_exc_met = [orgnames + ' ' +
-                           comexcmet for comexcmet in common_exchange_metabolite]
-        number_exc_met = list(range(0, len(common_exchange_metabolite)))
-        mod_exc_rxn_number = ['Org_%s ER' %
-                              orgnames + str(num + 1) for num in number_exc_met]
-        mod_exc_rev_rxn_number = ['Org_%s ERR' %
-                                  orgnames + str(num + 1) for num in number_exc_met]
-        G.add_nodes_from(mod_exc_rxn_number, bipartite=1)
-        G.add_nodes_from(mod_exc_rev_rxn_number, bipartite=1)
-        G.add_nodes_from(common_exchange_metabolite, bipartite=0)
-        G.add_nodes_from(renamed_exc_met, bipartite=0)
-        for k in range(len(renamed_exc_met)):
-            namemap[mod_exc_rxn_number[k]] = common_exchange_metabolite[k]
-            namemap[mod_exc_rev_rxn_number[k]] = common_exchange_metabolite[k]
-            G.add_edges_from([(renamed_exc_met[k], mod_exc_rxn_number[k])])
-            G.add_edges_from(
-                [(mod_exc_rxn_number[k], common_exchange_metabolite[k])])
-            G.add_edges_from(
-                [(common_exchange_metabolite[k], mod_exc_rev_rxn_number[k])])
-            G.add_edges_from([(mod_exc_rev_rxn_number[k], renamed_exc_met[k])])
+        _add_exchange_layer(nodes, edges, namemap, orgnames,
+                            common_exchange_metabolite, 'ER', 'ERR')
     #  Adding the non common exchange metabolites to the graph
     for orgnames in orgs:
         metitems = orgs[orgnames]['exchange_metab_nodes']
         non_common_exc_met = list(
             set(metitems) - set(common_exchange_metabolite))
         non_common_exc_met.sort()
-        renamed_non_common_exc_met = [
-            orgnames + ' ' + s for s in non_common_exc_met]
-        number_non_common_exc_met = list(range(0, len(non_common_exc_met)))
-        mod_non_common_exc_rxn_number = [
-            'Org_%s NCER' % orgnames + str(num + 1) for num in number_non_common_exc_met]
-        mod_non_common_exc_rev_rxn_number = [
-            'Org_%s NCERR' % orgnames + str(num + 1) for num in number_non_common_exc_met]
-        G.add_nodes_from(mod_non_common_exc_rxn_number, bipartite=1)
-        G.add_nodes_from(mod_non_common_exc_rev_rxn_number, bipartite=1)
-        G.add_nodes_from(non_common_exc_met, bipartite=0)
-        G.add_nodes_from(renamed_non_common_exc_met, bipartite=0)
-        for k in range(len(renamed_non_common_exc_met)):
-            namemap[mod_non_common_exc_rxn_number[k]] = non_common_exc_met[k]
-            namemap[mod_non_common_exc_rev_rxn_number[k]
-                   ] = non_common_exc_met[k]
-            G.add_edges_from(
-                [(renamed_non_common_exc_met[k], mod_non_common_exc_rxn_number[k])])
-            G.add_edges_from(
-                [(mod_non_common_exc_rxn_number[k], non_common_exc_met[k])])
-            G.add_edges_from(
-                [(non_common_exc_met[k], mod_non_common_exc_rev_rxn_number[k])])
-            G.add_edges_from(
-                [(mod_non_common_exc_rev_rxn_number[k], renamed_non_common_exc_met[k])])
+        _add_exchange_layer(nodes, edges, namemap, orgnames,
+                            non_common_exc_met, 'NCER', 'NCERR')
+    G.add_nodes_from(nodes)
+    G.add_edges_from(edges)
     return G, namemap
 
 
-def create_graph(file_names, no_of_orgs):
+def _add_exchange_layer(nodes, edges, namemap, orgnames, exchange_metabolites,
+                        exc_rxn_type, exc_rev_rxn_type):
+    """
+    This function lists the nodes and the edges of the exchange reactions of
+    an organism, for the given exchange metabolites, in the order in which
+    they are added to the graph.
+
+    Parameters
+    ----------
+    nodes : list
+        List of pairs of the nodes and their attributes, to which the nodes
+        are appended
+    edges : list
+        List of edges, to which the edges are appended
+    namemap : dict
+        Dictionary mapping the adhoc exchange reaction names to the
+        exchange metabolites, which is updated
+    orgnames : str
+        Name of the organism
+    exchange_metabolites : list
+        Sorted list of the exchange metabolites
+    exc_rxn_type : str
+        Type of the reactions from the organism to the environment
+        ('ER' or 'NCER')
+    exc_rev_rxn_type : str
+        Type of the reactions from the environment to the organism
+        ('ERR' or 'NCERR')
+
+    Returns
+    -------
+    None
+    """
+    reaction_attributes = {'bipartite': 1}
+    metabolite_attributes = {'bipartite': 0}
+    renamed_exc_met = [orgnames + ' ' + excmet for excmet in exchange_metabolites]
+    mod_exc_rxn_number = ['Org_%s %s' % (orgnames, exc_rxn_type) + str(num + 1)
+                          for num in range(len(exchange_metabolites))]
+    mod_exc_rev_rxn_number = ['Org_%s %s' % (orgnames, exc_rev_rxn_type) +
+                              str(num + 1)
+                              for num in range(len(exchange_metabolites))]
+    nodes.extend((rxn, reaction_attributes) for rxn in mod_exc_rxn_number)
+    nodes.extend((rxn, reaction_attributes) for rxn in mod_exc_rev_rxn_number)
+    nodes.extend((metab, metabolite_attributes) for metab in exchange_metabolites)
+    nodes.extend((metab, metabolite_attributes) for metab in renamed_exc_met)
+    for k in range(len(renamed_exc_met)):
+        namemap[mod_exc_rxn_number[k]] = exchange_metabolites[k]
+        namemap[mod_exc_rev_rxn_number[k]] = exchange_metabolites[k]
+        edges.append((renamed_exc_met[k], mod_exc_rxn_number[k]))
+        edges.append((mod_exc_rxn_number[k], exchange_metabolites[k]))
+        edges.append((exchange_metabolites[k], mod_exc_rev_rxn_number[k]))
+        edges.append((mod_exc_rev_rxn_number[k], renamed_exc_met[k]))
+
+
+def create_graph(file_names, no_of_orgs, compiled=False, cache_dir=None,
+                 cache_size=1 << 30, n_jobs=1):
     """
     This function creates bipartite graph of the organisms based on the
     path provided and the number of organsisms. For instance, if a folder
@@ -172,31 +223,65 @@ def create_graph(file_names, no_of_orgs):
     bipartite graphs are created. The graph objects and the dictionary
     are saved as gpickle and pickle files respectively.
 
+    The nodes and the edges of the internal reactions of every organism are
+    listed once and reused for all the combinations containing the
+    organism, so that only the exchange reactions, which depend on the
+    organisms in the combination, are found for every graph.
+
     Parameters
     ----------
     file_names : list
         List containing the file names of models
     no_of_orgs : int
         Number of organisms to be used for creating the DiGraph.
+    compiled : bool
+        If True, the graphs are returned as CompiledGraph objects, where the
+        nodes are interned to integers and the adjacency is stored as
+        CSR arrays. By default, NetworkX DiGraphs are returned.
+    cache_dir : str
+        Directory in which the graphs and the namemap are cached, so that
+        the models are not read again when the same graphs are created
+        later. By default, nothing is cached
+    cache_size : int
+        Maximum size of the cache directory, in bytes. The graphs used least
+        recently are removed beyond it. By default, it is set to 1 GB
+    n_jobs : int
+        Number of processes reading the models (see
+        fetch_reactions.segregate_reactions_from_models). If -1, all the
+        processors are used. By default, it is set to 1
 
     Returns
     -------
-    H : NetworkX DiGraph Object
-        Bipartite graph consisting of internal and exchange reactions in organisms
+    H : list
+        List of bipartite graphs (NetworkX DiGraph Objects or CompiledGraph
+        objects) consisting of internal and exchange reactions in organisms
     full_name_map : dict
         Dictionary mapping the adhoc reaction names to reaction names in
         the model
+
+    Notes
+    -----
+    The graphs are cached under a hash of the names and the contents of the
+    models, of no_of_orgs, of compiled and of the version of the package
+    (see graph_cache_key), hence the cached graphs are not used once a model
+    changes or is moved, and the stale entries are eventually removed as the
+    least recently used ones.
     """
+    if cache_dir is not None:
+        cache_key = graph_cache.graph_cache_key(file_names, no_of_orgs, compiled)
+        cached_graphs = graph_cache.load_cached_graphs(cache_dir, cache_key)
+        if cached_graphs is not None:
+            print('Graphs loaded from', cache_dir)
+            return cached_graphs
 
     H=[]
+    internal_layers = {}
     organisms_reaction_data, partial_name_map = \
-        fetch_reactions.segregate_reactions_from_models(file_names)
+        fetch_reactions.segregate_reactions_from_models(file_names, n_jobs)
     if organisms_reaction_data:
         organisms_names = list(organisms_reaction_data.keys())
-        all_possible_combis = list(itertools.combinations(
-            list(range(len(organisms_names))), int(no_of_orgs)))
-        if int(no_of_orgs)>1 and sorted(organisms_names)[0][0]=='0':
-            all_possible_combis = all_possible_combis[:len(organisms_names)-1]
+        all_possible_combis = _combinations_of_organisms(organisms_names,
+                                                         no_of_orgs)
         if all_possible_combis:
             for ncom in range(len(all_possible_combis)):
                 file_name = ''
@@ -207,13 +292,16 @@ def create_graph(file_names, no_of_orgs):
                     file_name = file_name + \
                         organisms_names[all_possible_combis[ncom]
                                         [numincom]] + '_'
-                H.append(_create_graph_with_internal_reaction(current_combination))
+                H.append(_create_graph_with_internal_reaction(
+                    current_combination, internal_layers))
                 temp, full_name_map = _create_graph_with_exchange_reactions(
                     H[ncom], current_combination, partial_name_map)
+                if compiled:
+                    temp = compile_graph(temp)
                 H[ncom]=temp
                 print(len(H), H[ncom])
-                print('Number of edges in graph', len(H[ncom].edges()))
-                print('Number of nodes in graph', len(H[ncom].nodes()))
+                print('Number of edges in graph', H[ncom].number_of_edges())
+                print('Number of nodes in graph', H[ncom].number_of_nodes())
 
                 # Uncomment the following code to save the graph files externally in your machine
                 # Note: Graph files can occupy a large space for large datasets
@@ -232,4 +320,235 @@ def create_graph(file_names, no_of_orgs):
     else:
         print("Cannot create graph")
         sys.exit()
+    if cache_dir is not None:
+        graph_cache.save_cached_graphs(cache_dir, cache_key, (H, full_name_map),
+                                       cache_size)
     return H, full_name_map
+
+
+def iter_graphs(file_names, no_of_orgs, compiled=False, combination_indices=None,
+                n_jobs=1):
+    """
+    This function creates the bipartite graphs of the combinations of
+    organisms one at a time, as create_graph does, so that every graph can
+    be analysed and discarded before the next one is created.
+
+    Parameters
+    ----------
+    file_names : list
+        List containing the file names of models
+    no_of_orgs : int
+        Number of organisms to be used for creating the DiGraph.
+    compiled : bool
+        If True, the graphs are CompiledGraph objects. By default, NetworkX
+        DiGraphs are created
+    combination_indices : iterable
+        Indices of the combinations for which the graphs are created, in
+        the order of the list returned by create_graph. Only the models of
+        the organisms in these combinations are read. By default, the
+        graphs of all the combinations are created
+    n_jobs : int
+        Number of processes reading the models. If -1, all the processors
+        are used. By default, it is set to 1
+
+    Yields
+    ------
+    combination : tuple
+        Names of the organisms in the combination
+    G : NetworkX DiGraph Object or CompiledGraph
+        Bipartite graph consisting of internal and exchange reactions in the
+        organisms of the combination
+    namemap : ChainMap
+        Dictionary mapping the adhoc reaction names of the graph to reaction
+        names in the model. The names of the exchange reactions depend on
+        the organisms in the combination, hence every graph has its own
+        namemap
+
+    Notes
+    -----
+    The models are read once, and the internal reactions of every organism
+    are listed once (see create_graph). The indices of the combinations
+    let different processes create only the graphs they analyse.
+
+    The combinations are those of the organisms in the order of the files,
+    hence the organisms of the given indices are found from file_names
+    alone, and every model must have its own ID. When the name of an
+    organism starts with '0', create_graph keeps only the first
+    combinations (one less than the number of models for pairs), and the
+    indices beyond them must not be given, since the names of the models
+    which are not read are not known.
+
+    Examples
+    --------
+    >>> for combination, G, namemap in iter_graphs(file_names, 2):
+    ...     lower_bound_metabolite, status_dict, scope = forward_pass(G, seedmets)
+    """
+    internal_layers = {}
+    if combination_indices is None:
+        organisms_reaction_data, partial_name_map = \
+            fetch_reactions.segregate_reactions_from_models(file_names, n_jobs)
+        if not organisms_reaction_data:
+            print("Cannot create graph")
+            return
+        organisms_names = list(organisms_reaction_data.keys())
+        all_possible_combis = _combinations_of_organisms(organisms_names,
+                                                         no_of_orgs)
+        if not all_possible_combis:
+            print('Number of organisms for creating a consortium graph is more than the models given')
+            return
+        combination_indices = range(len(all_possible_combis))
+    else:
+        combination_indices = list(combination_indices)
+        all_possible_combis = list(itertools.combinations(
+            list(range(len(file_names))), int(no_of_orgs)))
+        if not all_possible_combis:
+            print('Number of organisms for creating a consortium graph is more than the models given')
+            return
+        # Only the models of the organisms in the given combinations are
+        # read, and their names are placed at the indices of their files
+        files_to_read = sorted(set(
+            orgidx for ncom in combination_indices
+            for orgidx in all_possible_combis[ncom]))
+        organisms_reaction_data, partial_name_map = \
+            fetch_reactions.segregate_reactions_from_models(
+                [file_names[orgidx] for orgidx in files_to_read], n_jobs)
+        if len(organisms_reaction_data) != len(files_to_read):
+            print("Cannot create graph, the models must have different IDs")
+            return
+        organisms_names = [None] * len(file_names)
+        for orgidx, orgnames in zip(files_to_read, organisms_reaction_data):
+            organisms_names[orgidx] = orgnames
+    for ncom in combination_indices:
+        combination = tuple(organisms_names[orgidx]
+                            for orgidx in all_possible_combis[ncom])
+        current_combination = {}
+        for orgnames in combination:
+            current_combination[orgnames] = organisms_reaction_data[orgnames]
+        G = _create_graph_with_internal_reaction(current_combination,
+                                                 internal_layers)
+        exchange_name_map = {}
+        G, exchange_name_map = _create_graph_with_exchange_reactions(
+            G, current_combination, exchange_name_map)
+        if compiled:
+            G = compile_graph(G)
+        yield combination, G, ChainMap(exchange_name_map, partial_name_map)
+
+
+def _combinations_of_organisms(organisms_names, no_of_orgs):
+    """
+    Returns the list of the combinations of no_of_orgs organisms, as tuples
+    of the indices of the organisms. If the name of an organism starts with
+    '0', only the first combinations, one less than the number of organisms,
+    are kept, i.e., for pairs, the first organism with every other organism
+    """
+    all_possible_combis = list(itertools.combinations(
+        list(range(len(organisms_names))), int(no_of_orgs)))
+    if int(no_of_orgs)>1 and sorted(organisms_names)[0][0]=='0':
+        all_possible_combis = all_possible_combis[:len(organisms_names)-1]
+    return all_possible_combis
+
+
+def prune_graph(G, seedmets, targets=None):
+    """
+    This function removes the reactions which can never take place, the
+    metabolites which can never be produced and the dead-end metabolites,
+    so that the forward pass and the pathway calculations on the graph have
+    fewer nodes to go over.
+
+    Parameters
+    ----------
+    G : NetworkX DiGraph Object or CompiledGraph
+        Bipartite graph of the metabolic network
+    seedmets : set
+        Set of seed metabolites including the source
+    targets : set
+        Metabolites which are kept even if no reaction consumes them, e.g.,
+        the metabolites whose pathways are to be found. By default, only
+        the seed metabolites are kept
+
+    Returns
+    -------
+    pruned_graph : NetworkX DiGraph Object or CompiledGraph
+        Bipartite graph without the removed nodes, of the same type as G.
+        The names of the nodes are not changed
+    removed_reactions : list
+        Sorted list of the reactions removed
+    removed_metabolites : list
+        Sorted list of the metabolites removed
+
+    Notes
+    -----
+    The reactions which are not visited by the forward pass from the seed
+    metabolites are removed, along with the metabolites which are not in
+    the scope. Then, the metabolites which are not seed metabolites or
+    targets, and which no remaining reaction consumes, are removed as dead
+    ends, as well as the reactions all of whose products are removed. This
+    is repeated until nothing more can be removed, since removing a
+    reaction can leave its inputs without a consuming reaction. Seed
+    metabolites, such as exchange metabolites which are not used, are also
+    removed once no reaction is left around them.
+
+    A reaction which only produces dead-end metabolites is never part of
+    a pathway to another metabolite, hence the pathways of the metabolites
+    left in the pruned graph, which are found from these seed metabolites,
+    are the same as on G. The pathways of the removed dead-end metabolites
+    are not found on the pruned graph.
+
+    Examples
+    --------
+    >>> pruned_graph, _, _ = prune_graph(G, seed_metabolites)
+    >>> pathway_table, cyclic_pathways, scope = find_pathways(
+    ...     pruned_graph, seed_metabolites, 15)
+    """
+    if isinstance(G, CompiledGraph):
+        reaction_nodes = G.reactions()
+    else:
+        reaction_nodes = [nodes for nodes, bipartite in G.nodes(data='bipartite')
+                          if bipartite == 1]
+    reaction_set = set(reaction_nodes)
+    metabolite_nodes = [metab for metab in G.nodes() if metab not in reaction_set]
+    kept_metabolites = set(seedmets)
+    if targets is not None:
+        kept_metabolites.update(targets)
+    _, status_dict, scope = forward_pass(G, set(seedmets))
+    removed_nodes = set(rxn for rxn in reaction_nodes
+                        if status_dict.get(rxn) != 'V')
+    removed_nodes.update(metab for metab in metabolite_nodes
+                         if metab not in scope)
+    for rxn in reaction_nodes:
+        if rxn not in removed_nodes and all(
+                metab in removed_nodes for metab in G.successors(rxn)):
+            removed_nodes.add(rxn)
+    # Metabolites which may have been left without a consuming reaction.
+    # Removing a dead end can remove the reactions producing it, which in
+    # turn can leave their inputs without a consuming reaction
+    candidates = list(metabolite_nodes)
+    while candidates:
+        metab = candidates.pop()
+        if metab in removed_nodes or metab in kept_metabolites:
+            continue
+        if any(rxn not in removed_nodes for rxn in G.successors(metab)):
+            continue
+        removed_nodes.add(metab)
+        for rxn in G.predecessors(metab):
+            if rxn not in removed_nodes and all(
+                    product in removed_nodes for product in G.successors(rxn)):
+                removed_nodes.add(rxn)
+                candidates.extend(G.predecessors(rxn))
+    for metab in metabolite_nodes:
+        if metab not in removed_nodes and all(
+                rxn in removed_nodes for rxn in
+                itertools.chain(G.predecessors(metab), G.successors(metab))):
+            removed_nodes.add(metab)
+    removed_reactions = sorted(rxn for rxn in reaction_nodes
+                               if rxn in removed_nodes)
+    removed_metabolites = sorted(metab for metab in metabolite_nodes
+                                 if metab in removed_nodes)
+    print('Number of reactions removed', len(removed_reactions))
+    print('Number of metabolites removed', len(removed_metabolites))
+    if isinstance(G, CompiledGraph):
+        pruned_graph = G.without_nodes(removed_nodes)
+    else:
+        pruned_graph = G.copy()
+        pruned_graph.remove_nodes_from(removed_nodes)
+    return pruned_graph, removed_reactions, removed_metabolites
@@ -60,10 +60,15 @@ def run_this_example():
             break
     if metfoundingraph:
         folder_to_create = 'foo'
-        for currenttarmet in targetmetabolites:  # multiple target mets
-            for cutoff in cutoff_list:  # multiple cutoffs
-                pathway_table, cyclic_pathways, scope = \
-                                pathway_assembler.find_pathways(G, seed_metabolites, int(cutoff))
+        # The pathway table is filled once up to the largest cutoff
+        assembler = pathway_assembler.PathwayAssembler(G, seed_metabolites)
+        assembler.run(max(int(cutoff) for cutoff in cutoff_list))
+        scope = assembler.scope
+        for cutoff in cutoff_list:  # multiple cutoffs
+            # The table of a cutoff is obtained once for all the targets
+            pathway_table = assembler.get_pathway_table(int(cutoff))
+            cyclic_pathways = assembler.get_cyclic_pathways(int(cutoff))
+            for currenttarmet in targetmetabolites:  # multiple target mets
                 assert currenttarmet in pathway_table
                 assert len(pathway_table['iJO1366 pyr_c'][15]) == 806
                 number_of_pathways = []
@@ -2,12 +2,34 @@
 from __future__ import absolute_import
 import os
 import sys
+import time
 from collections import Counter
 from itertools import combinations
-from metquest.pathway_assembler import find_pathways
+from metquest.pathway_assembler import PathwayAssembler
 from metquest.construct_graph import create_graph
 
 
+class _ReactionLines(dict):
+    """
+    Lines written for the reactions of the pathways, i.e., the name of the
+    reaction in the model followed by its equation. The line of a reaction
+    is built from the graph the first time the reaction is written, since
+    the same reactions take part in many pathways.
+    """
+
+    def __init__(self, namemap, G):
+        dict.__init__(self)
+        self.namemap = namemap
+        self.G = G
+
+    def __missing__(self, entities):
+        line = self.namemap[entities] + '\t' + \
+            ' + '.join(self.G.predecessors(entities)) + '->' + \
+            ' + '.join(self.G.successors(entities)) + '\n'
+        self[entities] = line
+        return line
+
+
 def write_output_to_file(pathway_table, currenttarmet, cutoff, cyclic_pathways,
                          folder_to_create, namemap, source_metabolites, G):
     """
@@ -36,7 +58,7 @@ def write_output_to_file(pathway_table, currenttarmet, cutoff, cyclic_pathways,
         the model
     source_metabolites : list
         List of source metabolites
-    G : NetworkX DiGraph Object
+    G : NetworkX DiGraph Object or CompiledGraph
         Bipartite graph of the metabolic network
 
 
@@ -44,8 +66,8 @@ def write_output_to_file(pathway_table, currenttarmet, cutoff, cyclic_pathways,
     -------
     None
     """
-    pred = G.predecessors
     succ = G.successors
+    reaction_lines = _ReactionLines(namemap, G)
     all_pathways_count = []
     path_count = []
     cyclic_pathway_count = []
@@ -75,10 +97,7 @@ def write_output_to_file(pathway_table, currenttarmet, cutoff, cyclic_pathways,
                         filetowrite.write(
                             str(pathnumcount) + '\n')
                         for entities in list(items):
-                            filetowrite.write(
-                                namemap[entities] + '\t' + ' + '.join(pred(entities)) +
-                                '->' + ' + '.join(succ(entities)))
-                            filetowrite.write('\n')
+                            filetowrite.write(reaction_lines[entities])
                         filetowrite.write('--------------------\n')
 
         if int(cutoff) in pathway_table[currenttarmet]:
@@ -98,21 +117,18 @@ def write_output_to_file(pathway_table, currenttarmet, cutoff, cyclic_pathways,
                                 filetowrite.write(
                                     str(pathnumcount) + '\n')
                                 for entities in list(items):
-                                    filetowrite.write(
-                                        namemap[entities] + '\t' +
-                                        ' + '.join(pred(entities))
-                                        + '->' + ' + '.join(succ(entities)))
-                                    filetowrite.write('\n')
+                                    filetowrite.write(reaction_lines[entities])
                                 filetowrite.write(
                                     '--------------------\n')
                             filetowrite.write('--------------------\n')
                 only_source_to_target = []
 
                 for sourcemets in source_metabolites:
+                    source_reactions = set(succ(sourcemets))
                     for idx in pathway_table[currenttarmet]:
                         if idx <= int(cutoff):
                             for items in pathway_table[currenttarmet][idx]:
-                                if set(succ(sourcemets)).intersection(items):
+                                if source_reactions.intersection(items):
                                     only_source_to_target.append(
                                         list(items))
                     if only_source_to_target:
@@ -127,17 +143,92 @@ def write_output_to_file(pathway_table, currenttarmet, cutoff, cyclic_pathways,
                                 filetowrite.write('Path length ' +
                                                   str(len(listentries)) + '\n')
                                 for entities in listentries:
-                                    filetowrite.write(
-                                        namemap[entities] + '\t' +
-                                        ' + '.join(pred(entities))
-                                        + '->' + ' + '.join(succ(entities)))
-                                    filetowrite.write('\n')
+                                    filetowrite.write(reaction_lines[entities])
                                 filetowrite.write('--------------------\n')
     else:
         print(currenttarmet, ': Target could not be found.')
         print('Consider changing the cut-off or the seed metabolite set')
 
 
+def write_pathways_to_file(pathways, currenttarmet, cutoff, folder_to_create,
+                           namemap, source_metabolites, G):
+    """
+    This function writes the branched pathways from seed to the target, and
+    from source to the target, as they are generated. Unlike
+    write_output_to_file, the pathways are not required to be in memory.
+
+    Parameters
+    ----------
+    pathways : iterable
+        Pairs of the size and the set of reactions of the pathways, in
+        increasing order of the sizes, as generated by iter_pathways
+    currenttarmet : str
+        Current target metabolite
+    cutoff : int
+        Maximum pathway length cutoff
+    folder_to_create : str
+        Name of the folder where results have to be written
+    namemap : dict
+        Dictionary mapping the adhoc reaction names to reaction names in
+        the model
+    source_metabolites : list
+        List of source metabolites
+    G : NetworkX DiGraph Object or CompiledGraph
+        Bipartite graph of the metabolic network
+
+    Returns
+    -------
+    pathnumcount : int
+        Number of pathways written
+    sourcepathcount : int
+        Number of pathways starting from the source metabolites written
+
+    Notes
+    -----
+    A pathway is written to the file of pathways from source once, if it
+    involves a reaction consuming any of the source metabolites.
+    """
+    succ = G.successors
+    reaction_lines_of = _ReactionLines(namemap, G)
+    source_reactions = set()
+    for sourcemets in source_metabolites:
+        source_reactions.update(succ(sourcemets))
+    seedfname = folder_to_create + 'branched_pathways_from_seed_' + \
+        currenttarmet.replace(' ', '') + '_' + 'leq_plen_' + str(cutoff) + '.txt'
+    sourcefname = folder_to_create + 'branched_pathways_from_source_' + \
+        currenttarmet.replace(' ', '') + '_' + 'leq_plen_' + str(cutoff) + '.txt'
+    pathnumcount = 0
+    sourcepathcount = 0
+    print('Writing branched pathways (from seed and source) to files')
+    with open(seedfname, 'w') as seedfile, open(sourcefname, 'w') as sourcefile:
+        previous_plen = None
+        for plen, items in pathways:
+            if plen > int(cutoff):
+                break
+            if plen != previous_plen:
+                if previous_plen is not None:
+                    seedfile.write('--------------------\n')
+                seedfile.write('Path length ' + str(plen) + '\n')
+                previous_plen = plen
+            pathnumcount += 1
+            seedfile.write(str(pathnumcount) + '\n')
+            reaction_lines = [reaction_lines_of[entities]
+                              for entities in list(items)]
+            seedfile.writelines(reaction_lines)
+            seedfile.write('--------------------\n')
+            if source_reactions.intersection(items):
+                sourcepathcount += 1
+                sourcefile.write(str(sourcepathcount) + '\n')
+                sourcefile.write('Path length ' + str(len(items)) + '\n')
+                sourcefile.writelines(reaction_lines)
+                sourcefile.write('--------------------\n')
+        if previous_plen is not None:
+            seedfile.write('--------------------\n')
+    if not sourcepathcount:
+        os.remove(sourcefname)
+    return pathnumcount, sourcepathcount
+
+
 def find_pathways_starting_from_source(source_metabolites, pathway_table, currenttarmet, cutoff, G):
     """
     This function finds all pathways starting from the source metabolites
@@ -154,7 +245,7 @@ def find_pathways_starting_from_source(source_metabolites, pathway_table, curren
         Current target metabolite
     cutoff : int
         Maximum pathway length cutoff
-    G : NetworkX DiGraph Object
+    G : NetworkX DiGraph Object or CompiledGraph
         Bipartite graph of the metabolic network
 
     Returns
@@ -172,19 +263,18 @@ def find_pathways_starting_from_source(source_metabolites, pathway_table, curren
     only_source_to_target = []
     if currenttarmet in pathway_table:
         for sourcemets in source_metabolites:
+            source_reactions = set(succ(sourcemets))
             for idx in pathway_table[currenttarmet]:
                 if idx <= int(cutoff):
                     for items in pathway_table[currenttarmet][idx]:
-                        if set(succ(sourcemets)).intersection(items):
+                        if source_reactions.intersection(items):
                             only_source_to_target.append(
                                 list(items))
             if len(only_source_to_target) > 1:
                 # Sometimes there can be only one pathway producing target
                 # To find most different paths from source
-                j_value, rxn_comb = find_jaccard_between_paths(
+                most_different_paths[sourcemets] = find_most_different_paths(
                     only_source_to_target)
-                min_j_index = j_value.index(min(j_value))
-                most_different_paths[sourcemets] = rxn_comb[min_j_index]
     else:
         print(currenttarmet, ': Target could not be found.')
         print('Consider changing the cut-off or the seed metabolite set')
@@ -233,7 +323,7 @@ def print_summary(scope, currenttarmet, pathway_table, cutoff, cyclic_pathways,
         Set of seed metabolites including the source
     number_of_xml : int
         Number of xml files in the folder
-    G : NetworkX DiGraph Object
+    G : NetworkX DiGraph Object or CompiledGraph
         Bipartite graph of the metabolic network
 
     Returns
@@ -326,8 +416,9 @@ def find_important_reactions(all_reactions_involved, currenttarmet, seed_metabol
 
     Parameters
     ----------
-    all_reactions_involved : list
-        list of all reactions found in all the pathways from source to target
+    all_reactions_involved : iterable
+        all reactions found in all the pathways from source to target. The
+        reactions can also be generated, for instance from iter_pathways
     currenttarmet : str
         Current target metabolite
     seed_metabolites : set
@@ -335,7 +426,7 @@ def find_important_reactions(all_reactions_involved, currenttarmet, seed_metabol
     namemap : dict
         Dictionary mapping the adhoc reaction names to reaction names in
         the model
-    G : NetworkX DiGraph Object
+    G : NetworkX DiGraph Object or CompiledGraph
         Bipartite graph of the metabolic network
 
 
@@ -363,9 +454,10 @@ def find_important_reactions(all_reactions_involved, currenttarmet, seed_metabol
     top_candidate = number_of_occurrences[:-6:-1]
 
     important_reactions = []
+    target_reactions = set(pred(currenttarmet))
     for numrepeats in top_candidate:
         for rxns in important_reactions_inverted_dict[numrepeats]:
-            if rxns not in pred(currenttarmet):
+            if rxns not in target_reactions:
                 if not set(pred(rxns)).issubset(seed_metabolites):
                     important_reactions.append(rxns)
     important_reactions_model_names = []
@@ -402,7 +494,7 @@ def find_pathways_involving_exchange_mets(number_of_xml, pathway_table, currentt
     namemap : dict
         Dictionary mapping the adhoc reaction names to reaction names in
         the model
-    G : NetworkX DiGraph Object
+    G : NetworkX DiGraph Object or CompiledGraph
         Bipartite graph of the metabolic network
 
     Returns
@@ -420,10 +512,12 @@ def find_pathways_involving_exchange_mets(number_of_xml, pathway_table, currentt
         for plen in pathway_table[currenttarmet]:
             for pathways in pathway_table[currenttarmet][plen]:
                 for reactions in pathways:
-                    if not set(pred(reactions)).issubset(seed_metabolites):
-                        #  'ER' is an adhoc reaction name assigned to exchange
-                        #  reactions in the models.
-                        if 'ER' in reactions:
+                    #  'ER' is an adhoc reaction name assigned to exchange
+                    #  reactions in the models. The name is checked first,
+                    #  so that the inputs of the other reactions are not
+                    #  looked up
+                    if 'ER' in reactions:
+                        if not set(pred(reactions)).issubset(seed_metabolites):
                             exchange_reactions.append(reactions)
         exchange_candidates = Counter(exchange_reactions)
 
@@ -436,9 +530,10 @@ def find_pathways_involving_exchange_mets(number_of_xml, pathway_table, currentt
         # [:-6:-1] # Taking the top reaction
         top_candidate = number_of_occurrences[:-10:-1]
         exchange_reactions = []
+        target_reactions = set(pred(currenttarmet))
         for numrepeats in top_candidate:
             for rxns in exchange_candidates_inverted_dict[numrepeats]:
-                if rxns not in pred(currenttarmet):
+                if rxns not in target_reactions:
                     if not set(pred(rxns)).issubset(seed_metabolites):
                         exchange_reactions.append(rxns)
         if exchange_reactions:
@@ -486,6 +581,52 @@ def find_jaccard_between_paths(only_source_to_target):
     return jaccard_values, path_combinations
 
 
+def find_most_different_paths(only_source_to_target):
+    """
+    This function determines the combination of two pathways with the
+    minimum jaccard value, i.e., the two most different pathways.
+
+    Parameters
+    ----------
+    only_source_to_target : iterable
+        Pathways (lists of reactions) producing the target metabolite from
+        the source
+
+    Returns
+    -------
+    path_combination : tuple
+        Combination of the two most different pathways, or None if there are
+        less than two pathways
+
+    Notes
+    -----
+    This returns the same combination as taking the minimum of the jaccard
+    values from find_jaccard_between_paths, without storing the jaccard
+    values of all the combinations. Pathways are compared with the
+    pathways before them as they are read, hence they can be generated.
+    """
+    previous_paths = []
+    previous_sets = []
+    min_j_value = None
+    min_j_index = None
+    for currentidx, currentpath in enumerate(only_source_to_target):
+        currentset = set(currentpath)
+        for previousidx, previousset in enumerate(previous_sets):
+            j_value = len(previousset.intersection(currentset))/len(
+                previousset.union(currentset))
+            # The combinations are ordered by the index of the first pathway,
+            # and then by the index of the second one
+            if min_j_value is None or j_value < min_j_value or \
+                    (j_value == min_j_value and previousidx < min_j_index[0]):
+                min_j_value = j_value
+                min_j_index = (previousidx, currentidx)
+        previous_paths.append(currentpath)
+        previous_sets.append(currentset)
+    if min_j_index is None:
+        return None
+    return previous_paths[min_j_index[0]], previous_paths[min_j_index[1]]
+
+
 def execute_all_codes():
     """
     This function executes all the codes including constructing graphs and executing metquest.
@@ -560,16 +701,28 @@ def execute_all_codes():
                         folder_to_create = 'Results/'
                         if not os.path.exists(folder_to_create):
                             os.makedirs(folder_to_create)
-                        for currenttarmet in targetmetabolites:  # multiple target mets
-                            for cutoff in cutoff_list:  # multiple cutoffs
-                                pathway_table, cyclic_pathways, scope = find_pathways(
-                                    G, seed_metabolites, int(cutoff))
+                        # The pathway table is filled once up to the largest
+                        # cutoff, and the tables of all the cutoffs are
+                        # obtained from it, since they do not depend on
+                        # the target metabolite
+                        assembler = PathwayAssembler(G, seed_metabolites)
+                        tic = time.perf_counter()
+                        assembler.run(max(int(cutoff) for cutoff in cutoff_list))
+                        print('Time taken', time.perf_counter() - tic)
+                        scope = assembler.scope
+                        # The table of a cutoff is obtained once for all the
+                        # targets, and only one table is held at a time
+                        for cutoff in cutoff_list:  # multiple cutoffs
+                            pathway_table = assembler.get_pathway_table(int(cutoff))
+                            cyclic_pathways = assembler.get_cyclic_pathways(int(cutoff))
+                            for currenttarmet in targetmetabolites:  # multiple target mets
                                 print_summary(scope, currenttarmet, pathway_table, cutoff, cyclic_pathways,
                                               namemap, source_metabolites, seed_metabolites,
                                               number_of_xml, G)
                                 write_output_to_file(pathway_table, currenttarmet, cutoff,
                                                      cyclic_pathways, folder_to_create,
                                                      namemap, source_metabolites, G)
+                            del pathway_table, cyclic_pathways
                         print('\n')
                     os.chdir('../')
         else:
@@ -5,10 +5,11 @@ from __future__ import absolute_import
 import os
 import glob
 import cobra
+from concurrent.futures import ProcessPoolExecutor
 from metquest.get_reaction_types import find_different_reaction_types
 
 
-def segregate_reactions_from_models(file_names):
+def segregate_reactions_from_models(file_names, n_jobs=1):
     """
     This function gets the data pertaining to the reactions and the
     metabolites from the models of multiple organisms.
@@ -21,6 +22,9 @@ def segregate_reactions_from_models(file_names):
     ----------
     file_names : list
         List of files names of models
+    n_jobs : int
+        Number of processes reading the models. If -1, all the processors
+        are used. By default, it is set to 1
 
     Returns
     -------
@@ -31,84 +35,120 @@ def segregate_reactions_from_models(file_names):
         Dictionary mapping the adhoc reaction names to reaction names in
         the model
 
+    Notes
+    -----
+    When n_jobs is greater than 1, the models are read and their reactions
+    classified in a pool of processes. The results are gathered in the
+    order of the files, hence they are the same as with a single process.
     """
+    if n_jobs == -1:
+        n_jobs = os.cpu_count() or 1
     all_organisms_info = {}
     namemap = {}
-    for model_names in file_names:
-        model = cobra.io.read_sbml_model(model_names)
-        stoi = cobra.util.array.create_stoichiometric_matrix(model)
-        if model.id:
-            current_model_name = model.id
-        else:
-            print("Model ID not found; using file name instead")
-            current_model_name = model_names.split('.')[0]
-        current_organisms_info = {current_model_name: {'exchange_metab_nodes': [],
-                                                       'irreversible_lhs_nodes': [],
-                                                       'irreversible_rhs_nodes': [],
-                                                       'reversible_rhs_nodes': [],
-                                                       'reversible_lhs_nodes': [],
-                                                       'irreversible_rxn_no': [],
-                                                       'reversible_rxn_no': [],
-                                                       'total_nodes': [],
-                                                       'model_rxns': [],
-                                                       'metabolites': [],
-                                                       'exch_rxn_name': [],
-                                                       'irrev_rxn_name': [],
-                                                       'rev_rxn_name': []}}
-        rxns_in_model = []
-        mets_in_model = []
-        for metab in model.metabolites:
-            mets_in_model.append(metab.id)
-        for reac in model.reactions:
-            rxns_in_model.append(reac.id)
-        stoi_matrix = stoi.T
-        exchange_nodes, irrev_lhs_nodes, irrev_rhs_nodes, rev_lhs_nodes, rev_rhs_nodes, \
-            exc_name, irrev_rxn_name, rev_rxn_name = find_different_reaction_types(
-                stoi_matrix, model, current_model_name)
-        current_organisms_info[current_model_name][
-            'exchange_metab_nodes'] = exchange_nodes
-        current_organisms_info[current_model_name][
-            'irreversible_lhs_nodes'] = irrev_lhs_nodes
-        current_organisms_info[current_model_name][
-            'irreversible_rhs_nodes'] = irrev_rhs_nodes
-        current_organisms_info[current_model_name][
-            'reversible_lhs_nodes'] = rev_lhs_nodes
-        current_organisms_info[current_model_name][
-            'reversible_rhs_nodes'] = rev_rhs_nodes
-        current_organisms_info[current_model_name]['exch_rxn_name'] = exc_name
-        current_organisms_info[current_model_name][
-            'irrev_rxn_name'] = irrev_rxn_name
-        current_organisms_info[current_model_name][
-            'rev_rxn_name'] = rev_rxn_name
+    if n_jobs > 1 and len(file_names) > 1:
+        with ProcessPoolExecutor(max_workers=min(n_jobs, len(file_names))) as executor:
+            models_info = list(executor.map(_segregate_reactions_from_model,
+                                            file_names))
+    else:
+        models_info = map(_segregate_reactions_from_model, file_names)
+    for current_organisms_info, current_namemap in models_info:
+        all_organisms_info.update(current_organisms_info)
+        namemap.update(current_namemap)
+    return all_organisms_info, namemap
 
-        irrev_rxn_number = []
-        for num in range(len(irrev_lhs_nodes)):
-            modified_name_irrev = 'Org_%s IR' % current_model_name + str(num + 1)
-            irrev_rxn_number.append(modified_name_irrev)
-            namemap[modified_name_irrev] = irrev_rxn_name[num]
 
-        rev_rxn_number = []
-        for num in range(len(rev_lhs_nodes)):
-            modified_name_rev = 'Org_%s RR' % current_model_name + str(num + 1)
-            rev_rxn_number.append(modified_name_rev)
-            namemap[modified_name_rev] = rev_rxn_name[num]
+def _segregate_reactions_from_model(model_names):
+    """
+    This function gets the data pertaining to the reactions and the
+    metabolites from the model of an organism.
 
-        rev_back_rxn_number = []
-        for num in range(len(rev_lhs_nodes)):
-            modified_name_back_rev = 'Org_%s RevBR' % current_model_name + \
-                str(num + 1)
-            rev_back_rxn_number.append(modified_name_back_rev)
-            namemap[modified_name_back_rev] = rev_rxn_name[num]
+    Parameters
+    ----------
+    model_names : str
+        File name of the model
 
-        current_organisms_info[current_model_name][
-            'reversible_rxn_no'] = rev_rxn_number
-        current_organisms_info[current_model_name][
-            'irreversible_rxn_no'] = irrev_rxn_number
-        current_organisms_info[current_model_name]['total_nodes'] = len(
-            exchange_nodes) + len(irrev_lhs_nodes) + len(rev_lhs_nodes)
-        current_organisms_info[current_model_name]['model_rxns'] = rxns_in_model
-        current_organisms_info[current_model_name][
-            'reversible_back_rxn_no'] = rev_back_rxn_number
-        current_organisms_info[current_model_name]['metabolites'] = mets_in_model
-        all_organisms_info.update(current_organisms_info)
-    return all_organisms_info, namemap
+    Returns
+    -------
+    current_organisms_info : dict
+        Dictionary of the model data, with the name of the model as key
+    namemap : dict
+        Dictionary mapping the adhoc reaction names to reaction names in
+        the model
+    """
+    namemap = {}
+    model = cobra.io.read_sbml_model(model_names)
+    stoi = cobra.util.array.create_stoichiometric_matrix(model)
+    if model.id:
+        current_model_name = model.id
+    else:
+        print("Model ID not found; using file name instead")
+        current_model_name = model_names.split('.')[0]
+    current_organisms_info = {current_model_name: {'exchange_metab_nodes': [],
+                                                   'irreversible_lhs_nodes': [],
+                                                   'irreversible_rhs_nodes': [],
+                                                   'reversible_rhs_nodes': [],
+                                                   'reversible_lhs_nodes': [],
+                                                   'irreversible_rxn_no': [],
+                                                   'reversible_rxn_no': [],
+                                                   'total_nodes': [],
+                                                   'model_rxns': [],
+                                                   'metabolites': [],
+                                                   'exch_rxn_name': [],
+                                                   'irrev_rxn_name': [],
+                                                   'rev_rxn_name': []}}
+    rxns_in_model = []
+    mets_in_model = []
+    for metab in model.metabolites:
+        mets_in_model.append(metab.id)
+    for reac in model.reactions:
+        rxns_in_model.append(reac.id)
+    stoi_matrix = stoi.T
+    exchange_nodes, irrev_lhs_nodes, irrev_rhs_nodes, rev_lhs_nodes, rev_rhs_nodes, \
+        exc_name, irrev_rxn_name, rev_rxn_name = find_different_reaction_types(
+            stoi_matrix, model, current_model_name)
+    current_organisms_info[current_model_name][
+        'exchange_metab_nodes'] = exchange_nodes
+    current_organisms_info[current_model_name][
+        'irreversible_lhs_nodes'] = irrev_lhs_nodes
+    current_organisms_info[current_model_name][
+        'irreversible_rhs_nodes'] = irrev_rhs_nodes
+    current_organisms_info[current_model_name][
+        'reversible_lhs_nodes'] = rev_lhs_nodes
+    current_organisms_info[current_model_name][
+        'reversible_rhs_nodes'] = rev_rhs_nodes
+    current_organisms_info[current_model_name]['exch_rxn_name'] = exc_name
+    current_organisms_info[current_model_name][
+        'irrev_rxn_name'] = irrev_rxn_name
+    current_organisms_info[current_model_name][
+        'rev_rxn_name'] = rev_rxn_name
+
+    irrev_rxn_number = []
+    for num in range(len(irrev_lhs_nodes)):
+        modified_name_irrev = 'Org_%s IR' % current_model_name + str(num + 1)
+        irrev_rxn_number.append(modified_name_irrev)
+        namemap[modified_name_irrev] = irrev_rxn_name[num]
+
+    rev_rxn_number = []
+    for num in range(len(rev_lhs_nodes)):
+        modified_name_rev = 'Org_%s RR' % current_model_name + str(num + 1)
+        rev_rxn_number.append(modified_name_rev)
+        namemap[modified_name_rev] = rev_rxn_name[num]
+
+    rev_back_rxn_number = []
+    for num in range(len(rev_lhs_nodes)):
+        modified_name_back_rev = 'Org_%s RevBR' % current_model_name + \
+            str(num + 1)
+        rev_back_rxn_number.append(modified_name_back_rev)
+        namemap[modified_name_back_rev] = rev_rxn_name[num]
+
+    current_organisms_info[current_model_name][
+        'reversible_rxn_no'] = rev_rxn_number
+    current_organisms_info[current_model_name][
+        'irreversible_rxn_no'] = irrev_rxn_number
+    current_organisms_info[current_model_name]['total_nodes'] = len(
+        exchange_nodes) + len(irrev_lhs_nodes) + len(rev_lhs_nodes)
+    current_organisms_info[current_model_name]['model_rxns'] = rxns_in_model
+    current_organisms_info[current_model_name][
+        'reversible_back_rxn_no'] = rev_back_rxn_number
+    current_organisms_info[current_model_name]['metabolites'] = mets_in_model
+    return current_organisms_info, namemap
@@ -2,7 +2,7 @@
 
 from __future__ import absolute_import
 
-from itertools import product
+from functools import lru_cache
 
 
 def generate_partitions(maximumvalue, lbnumlist, columnvalue):
@@ -14,37 +14,63 @@ def generate_partitions(maximumvalue, lbnumlist, columnvalue):
     Parameters
     ----------
     maximumvalue : int
-        Maximum values which the numbers can take
+        Desired sum to be obtained
     lbnumlist : list
         a list of values pertaining to the length of shortest paths of
         every metabolite
     columnvalue : int
-        Desired sum to be obtained
-        All the partitions of numbers which will generate the desired sum
-        whose values are between the values for shortest paths and the
-        maximum values.
+        Maximum values which the numbers can take
     Returns
     -------
     all_partitions : List of tuples
+        All the partitions of numbers which will generate the desired sum
+        whose values are between the values for shortest paths and the
+        maximum values.
 
     Notes
     -----
     For instance, if the column value is 7, the number of imputs is 2,
     and the shortest path of the metabolites is 4,3 respectively, and the
-    maximum sum that has to be obtained is 8, then
+    sum that has to be obtained is 8, then
 
-    >>> generate_partitions(7,[4,3],8)
+    >>> generate_partitions(8,[4,3],7)
     [(4, 4), (5, 3)]
 
-    >>> generate_partitions(4, [2,1,1], 5)
+    >>> generate_partitions(5, [2,1,1], 4)
     [(2, 1, 2), (2, 2, 1), (3, 1, 1)]
 
+    The partitions are generated directly in increasing (lexicographic)
+    order, choosing every number from the smallest to the largest value
+    which still allows the remaining numbers to add up to the desired sum.
+    Since the same arguments are repeated for many reactions, the partitions
+    are cached.
     """
-    all_combinations = []
-    for entry in lbnumlist:
-        all_combinations.append(list(range(entry, columnvalue + 1)))
+    return list(_bounded_compositions(maximumvalue, tuple(lbnumlist), columnvalue))
+
+
+@lru_cache(maxsize=4096)
+def _bounded_compositions(maximumvalue, lbnumtuple, columnvalue):
+    """
+    Returns the partitions of generate_partitions as a tuple of tuples
+    """
+    # Smallest sum of the numbers after every position
+    min_rest = [0] * (len(lbnumtuple) + 1)
+    for idx in range(len(lbnumtuple) - 1, -1, -1):
+        min_rest[idx] = min_rest[idx + 1] + lbnumtuple[idx]
     all_partitions = []
-    for partitions in product(*all_combinations):
-        if sum(partitions) == maximumvalue:
-            all_partitions.append(partitions)
-    return all_partitions
+    partition = []
+
+    def add_numbers(idx, remaining):
+        if idx == len(lbnumtuple):
+            if remaining == 0:
+                all_partitions.append(tuple(partition))
+            return
+        numbers_after = len(lbnumtuple) - idx - 1
+        lowest = max(lbnumtuple[idx], remaining - numbers_after * columnvalue)
+        highest = min(columnvalue, remaining - min_rest[idx + 1])
+        for number in range(lowest, highest + 1):
+            partition.append(number)
+            add_numbers(idx + 1, remaining - number)
+            partition.pop()
+    add_numbers(0, maximumvalue)
+    return tuple(all_partitions)
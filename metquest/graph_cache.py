@@ -0,0 +1,143 @@
+# -*- coding: utf-8 -*-
+
+from __future__ import absolute_import
+
+import os
+import pickle
+import hashlib
+from metquest.package_data import __version__
+
+
+def graph_cache_key(file_names, no_of_orgs, compiled):
+    """
+    This function returns the key under which the graphs created from the
+    models are cached.
+
+    Parameters
+    ----------
+    file_names : list
+        List containing the file names of models
+    no_of_orgs : int
+        Number of organisms used for creating the DiGraph
+    compiled : bool
+        True if the graphs are CompiledGraph objects
+
+    Returns
+    -------
+    key : str
+        SHA-256 digest of the names and the contents of the models, in the
+        order of the files, of the number of organisms, of the type of the
+        graphs and of the version of the package
+
+    Notes
+    -----
+    A model without an ID is named after its file name, as given (see
+    fetch_reactions.segregate_reactions_from_models), and this name is part
+    of the names of the nodes of the graphs. The file names are therefore
+    part of the key, as given, and a model which is moved, renamed or
+    copied gives a new key, as does a model whose contents change or a new
+    version of the package.
+    """
+    digest = hashlib.sha256()
+    digest.update(('%s\0%d\0%d\0' % (__version__, int(no_of_orgs),
+                                     bool(compiled))).encode('utf-8'))
+    for model_names in file_names:
+        digest.update(model_names.encode('utf-8') + b'\0')
+        model_digest = hashlib.sha256()
+        with open(model_names, 'rb') as filetoread:
+            for block in iter(lambda: filetoread.read(1 << 20), b''):
+                model_digest.update(block)
+        digest.update(model_digest.digest())
+    return digest.hexdigest()
+
+
+def load_cached_graphs(cache_dir, key):
+    """
+    This function reads the graphs and the namemap cached under a key.
+
+    Parameters
+    ----------
+    cache_dir : str
+        Directory of the cache
+    key : str
+        Key of the graphs (see graph_cache_key)
+
+    Returns
+    -------
+    cached_graphs : tuple
+        The graphs and the namemap, as returned by create_graph, or None if
+        they are not in the cache
+    """
+    cache_file = _cache_file(cache_dir, key)
+    try:
+        with open(cache_file, 'rb') as filetoread:
+            cached_graphs = pickle.load(filetoread)
+    except (OSError, pickle.UnpicklingError, EOFError):
+        return None
+    # The time of modification of the file is its time of last use, so that
+    # the entries used least recently are evicted first
+    try:
+        os.utime(cache_file)
+    except OSError:
+        pass
+    return cached_graphs
+
+
+def save_cached_graphs(cache_dir, key, cached_graphs, max_size=1 << 30):
+    """
+    This function writes the graphs and the namemap to the cache, and
+    evicts the entries used least recently if the cache is too large.
+
+    Parameters
+    ----------
+    cache_dir : str
+        Directory of the cache, which is created if needed
+    key : str
+        Key of the graphs (see graph_cache_key)
+    cached_graphs : tuple
+        The graphs and the namemap, as returned by create_graph
+    max_size : int
+        Maximum size of the cache, in bytes. By default, it is set to 1 GB
+
+    Returns
+    -------
+    None
+    """
+    os.makedirs(cache_dir, exist_ok=True)
+    cache_file = _cache_file(cache_dir, key)
+    temporary_file = cache_file + '.%d.tmp' % os.getpid()
+    with open(temporary_file, 'wb') as filetowrite:
+        pickle.dump(cached_graphs, filetowrite, pickle.HIGHEST_PROTOCOL)
+    os.replace(temporary_file, cache_file)
+    _evict(cache_dir, max_size, cache_file)
+
+
+def _cache_file(cache_dir, key):
+    return os.path.join(cache_dir, key + '.pickle')
+
+
+def _evict(cache_dir, max_size, kept_file):
+    """
+    Removes the entries of the cache used least recently, apart from the
+    one just written, until the cache is within the maximum size
+    """
+    entries = []
+    for filename in os.listdir(cache_dir):
+        if filename.endswith('.pickle'):
+            cache_file = os.path.join(cache_dir, filename)
+            try:
+                stat = os.stat(cache_file)
+            except OSError:
+                continue
+            entries.append((stat.st_mtime, stat.st_size, cache_file))
+    total_size = sum(size for _, size, _ in entries)
+    for _, size, cache_file in sorted(entries):
+        if total_size <= max_size:
+            break
+        if cache_file == kept_file:
+            continue
+        try:
+            os.remove(cache_file)
+        except OSError:
+            continue
+        total_size -= size
@@ -2,22 +2,29 @@
 
 from __future__ import absolute_import
 
+import heapq
 from collections import deque, defaultdict
+import numpy as np
+from metquest.compiled_graph import CompiledGraph, compile_graph
 
 
-def forward_pass(graph_object, seedmets):
+def forward_pass(graph_object, seedmets, excluded_reactions=None):
     """
     This function carries out the Guided Breadth First Search on a directed
     bipartite graph starting from the entries in seed metabolite set.
 
     Parameters
     ----------
-    graph_object : NetworkX DiGraph Object
+    graph_object : NetworkX DiGraph Object or CompiledGraph
         Bipartite graph of the metabolic network
 
     seedmets : set
         Set of seed metabolites including the source
 
+    excluded_reactions : set
+        Reactions which are treated as if they were not in the graph.
+        The graph itself is not modified. By default, no reaction is excluded
+
     Returns
     -------
     lower_bound_metabolite : defaultdict
@@ -39,66 +46,812 @@ def forward_pass(graph_object, seedmets):
     predecessors and are added to the queue. This traversal continues in a
     breadth-first manner and stops when there are no further reactions to
     be visited.
+
+    Instead of checking whether all the predecessors of a reaction are in
+    the scope every time one of its inputs is produced, the number of
+    precursors that are still missing is stored for every reaction and is
+    decremented as metabolites enter the scope. A reaction can be visited
+    once this count reaches zero. The reactions in the queue are also kept
+    in a set, so that both these checks take constant time.
+
+    If a CompiledGraph is given, the traversal is carried out on the
+    integer identifiers of the nodes and the results are mapped back to the
+    names of the nodes.
     """
-    pred = graph_object.predecessors
+    if isinstance(graph_object, CompiledGraph):
+        return _forward_pass_compiled(graph_object, seedmets, excluded_reactions)
     succ = graph_object.successors
+    if excluded_reactions:
+        succ = _without_excluded(succ, excluded_reactions)
+    return _guided_bfs(graph_object, graph_object.predecessors, succ, seedmets)
+
+
+def _without_excluded(succ, excluded_reactions):
+    """
+    Returns a function giving the successors of a node, leaving out the
+    excluded reactions
+    """
+    def succ_without_excluded(node):
+        return [succnode for succnode in succ(node)
+                if succnode not in excluded_reactions]
+    return succ_without_excluded
+
+
+def _forward_pass_compiled(compiled_graph, seedmets, excluded_reactions=None):
+    """
+    This function carries out the Guided Breadth First Search on the integer
+    identifiers of a CompiledGraph.
+
+    Parameters
+    ----------
+    compiled_graph : CompiledGraph
+        Bipartite graph of the metabolic network
+    seedmets : set
+        Set of seed metabolites including the source
+    excluded_reactions : set
+        Reactions which are treated as if they were not in the graph
+
+    Returns
+    -------
+    lower_bound_metabolite : defaultdict
+        Minimum number of steps required to reach a metabolite
+    status_dict : defaultdict
+        Dictionary pertaining to the status of every reaction - whether it
+        has been visited or not
+    scope : set
+        Set of metabolites that can be produced from the given set of
+        seed metabolites
+    """
+    names = compiled_graph.names
+    node_ids = compiled_graph.node_ids
+    pred, succ = compiled_graph.id_adjacency()
+    # The seed metabolites are taken in the order in which the traversal of
+    # the DiGraph takes them, so that the reactions are visited, and the
+    # results are ordered, as with the DiGraph
+    seed_order = [node_ids[metab] for metab in seedmets.copy()
+                  if metab in node_ids]
+    if excluded_reactions:
+        succ = _without_excluded(succ, set(
+            node_ids[rxn] for rxn in excluded_reactions if rxn in node_ids))
+    lower_bound_ids, status_ids, scope_ids = _guided_bfs(
+        range(len(names)), pred, succ, set(seed_order), seed_order)
+    lower_bound_metabolite = defaultdict(list)
+    # Seed metabolites which are not in the graph are still part of the scope
+    for seedmetabs in seedmets:
+        lower_bound_metabolite[seedmetabs] = [0]
+    for metid, stages in lower_bound_ids.items():
+        lower_bound_metabolite[names[metid]] = stages
+    status_dict = defaultdict(str)
+    for rxnid, status in status_ids.items():
+        status_dict[names[rxnid]] = status
+    scope = set(seedmets)
+    scope.update(names[metid] for metid in scope_ids)
+    return lower_bound_metabolite, status_dict, scope
+
+
+def _guided_bfs(graph_nodes, pred, succ, seedmets, seed_order=None):
+    """
+    This function carries out the Guided Breadth First Search described in
+    forward_pass, on any representation of the nodes of the graph.
+
+    Parameters
+    ----------
+    graph_nodes : container
+        Nodes of the bipartite graph
+    pred : function
+        Predecessors of a node in the bipartite graph
+    succ : function
+        Successors of a node in the bipartite graph
+    seedmets : set
+        Set of seed metabolites including the source
+    seed_order : list
+        Seed metabolites in the order in which they are taken. By default,
+        the order of iteration of the set of seed metabolites
+
+    Returns
+    -------
+    lower_bound_metabolite : defaultdict
+        Minimum number of steps required to reach a metabolite
+    status_dict : defaultdict
+        Dictionary pertaining to the status of every reaction - whether it
+        has been visited or not
+    scope : set
+        Set of metabolites that can be produced from the given set of
+        seed metabolites
+    """
     seed_metabolite_set = seedmets.copy()
+    if seed_order is None:
+        seed_order = seed_metabolite_set
     lower_bound_metabolite = defaultdict(list)
-    lower_bound_reaction = defaultdict(list)
     # Defaultdict is used simply because to avoid initialisations
     status_dict = defaultdict(str)
     # Using a deque since deques have O(1) speed for appendleft() and popleft()
     # while lists have O(n) performance for inserting and popping.
     queue = deque([])
+    # Reactions currently in the queue, for constant time membership checks
+    reactions_in_queue = set()
+    # Number of precursors of every reaction which are not in the scope yet
+    missing_precursors = {}
     # All seed metabolites are always present, hence require 0 steps
-    for seedmetabs in seed_metabolite_set:
+    for seedmetabs in seed_order:
         lower_bound_metabolite[seedmetabs].append(0)
     stage = 1
     scope = seed_metabolite_set.copy()
     starting_rxn_node = []
+    starting_rxn_set = set()
     # First stage where starting_rxn_node list contains all the reactions
     # which require only the seed metabolites as input
-    for starting_met_nodes in seed_metabolite_set:
+    for starting_met_nodes in seed_order:
         # Essential when analysing mutiple networks with same seed metabolite
         # set, although would be redundant in case of single network
-        if starting_met_nodes in graph_object:
+        if starting_met_nodes in graph_nodes:
             for startingrxns in succ(starting_met_nodes):
+                if startingrxns in starting_rxn_set:
+                    continue
                 if set(pred(startingrxns)).issubset(seed_metabolite_set):
-                    if startingrxns not in starting_rxn_node:
-                        starting_rxn_node.append(startingrxns)
+                    starting_rxn_node.append(startingrxns)
+                    starting_rxn_set.add(startingrxns)
                     for metsprod in succ(startingrxns):
-                        scope.add(metsprod)
-                        if stage not in lower_bound_metabolite[metsprod]:
-                            lower_bound_metabolite[metsprod].append(stage)
-                    if stage not in lower_bound_reaction[startingrxns]:
-                        lower_bound_reaction[startingrxns].append(stage)
+                        _add_to_scope(metsprod, scope, succ, missing_precursors)
+                        _add_stage(lower_bound_metabolite[metsprod], stage)
     for rxn in starting_rxn_node:
         for metabs in succ(rxn):
             for nextrxn in succ(metabs):
-                if set(pred(nextrxn)).issubset(scope):
-                    if nextrxn not in queue:
+                if _count_missing_precursors(nextrxn, pred, scope,
+                                             missing_precursors) == 0:
+                    if nextrxn not in reactions_in_queue:
                         queue.append(nextrxn)
+                        reactions_in_queue.add(nextrxn)
         status_dict[rxn] = 'V'
     while queue:
         stage += 1
         for parentrxn in list(queue):
             if status_dict[parentrxn] == '':
-                if stage not in lower_bound_reaction[parentrxn]:
-                    lower_bound_reaction[parentrxn].append(stage)
                 for mets in succ(parentrxn):
-                    scope.add(mets)
-                    if stage not in lower_bound_metabolite[mets]:
-                        lower_bound_metabolite[mets].append(stage)
+                    _add_to_scope(mets, scope, succ, missing_precursors)
+                    _add_stage(lower_bound_metabolite[mets], stage)
                     for progeny in succ(mets):
-                        if set(pred(progeny)).issubset(scope):
-
+                        if _count_missing_precursors(progeny, pred, scope,
+                                                     missing_precursors) == 0:
                             if status_dict[progeny] != 'V':
-                                if progeny not in queue:
+                                if progeny not in reactions_in_queue:
                                     queue.append(progeny)
+                                    reactions_in_queue.add(progeny)
                 status_dict[parentrxn] = 'V'
             elif status_dict[parentrxn] == 'V':
                 for mets in succ(parentrxn):
-                    if stage not in lower_bound_metabolite[mets]:
-                        lower_bound_metabolite[mets].append(stage)
+                    _add_stage(lower_bound_metabolite[mets], stage)
             queue.popleft()
+            reactions_in_queue.discard(parentrxn)
     return lower_bound_metabolite, status_dict, scope
+
+
+def backward_pass(graph_object, targetmets, visited_reactions, seedmets):
+    """
+    This function finds the reactions and the metabolites from which the
+    target metabolites can be reached, by walking backwards over the
+    reactions visited by the forward pass.
+
+    Parameters
+    ----------
+    graph_object : NetworkX DiGraph Object or CompiledGraph
+        Bipartite graph of the metabolic network
+    targetmets : iterable
+        Target metabolites
+    visited_reactions : dict or set
+        Reactions visited by the forward pass (status_dict)
+    seedmets : set
+        Set of seed metabolites including the source
+
+    Returns
+    -------
+    relevant_reactions : set
+        Visited reactions which take part in producing the targets
+    relevant_metabolites : set
+        Metabolites, other than the seed metabolites, which take part in
+        producing the targets, including the targets
+
+    Notes
+    -----
+    The walk does not go past the seed metabolites, since the pathways
+    producing them are never evaluated.
+    """
+    pred = graph_object.predecessors
+    relevant_reactions = set()
+    relevant_metabolites = set()
+    metabolites_to_visit = deque()
+    for metab in targetmets:
+        if metab in graph_object and metab not in seedmets and \
+                metab not in relevant_metabolites:
+            relevant_metabolites.add(metab)
+            metabolites_to_visit.append(metab)
+    while metabolites_to_visit:
+        metab = metabolites_to_visit.popleft()
+        for rxn in pred(metab):
+            if rxn in visited_reactions and rxn not in relevant_reactions:
+                relevant_reactions.add(rxn)
+                for inputmetab in pred(rxn):
+                    if inputmetab not in seedmets and \
+                            inputmetab not in relevant_metabolites:
+                        relevant_metabolites.add(inputmetab)
+                        metabolites_to_visit.append(inputmetab)
+    return relevant_reactions, relevant_metabolites
+
+
+def find_minimum_pathway_sizes(graph_object, seedmets, excluded_reactions=None):
+    """
+    This function finds a lower and an upper bound on the size of the
+    smallest branched pathway producing every metabolite in the scope,
+    without enumerating the pathways.
+
+    Parameters
+    ----------
+    graph_object : NetworkX DiGraph Object or CompiledGraph
+        Bipartite graph of the metabolic network
+    seedmets : set
+        Set of seed metabolites including the source
+    excluded_reactions : set
+        Reactions which are treated as if they were not in the graph.
+        By default, no reaction is excluded
+
+    Returns
+    -------
+    lower_bound_size : dict
+        Lower bound on the number of reactions of the smallest pathway
+        producing every metabolite in the scope
+    upper_bound_size : dict
+        Upper bound on the number of reactions of the smallest pathway
+        producing every metabolite in the scope
+    witness_pathways : dict
+        Set of reactions of a pathway producing every metabolite in the
+        scope, whose size is the upper bound
+
+    Notes
+    -----
+    The lower bound is the first stage at which the metabolite is reached
+    by the forward pass, since a pathway contains at least one reaction of
+    every stage it goes through.
+
+    The upper bound is found from a shortest hyperpath (Knuth's superior
+    function algorithm). Metabolites are taken in the increasing order of
+    the cost 1 + sum of the costs of the inputs of their best reaction, as
+    in Dijkstra's algorithm, and the pathway of a metabolite is the union of
+    its reaction and of the pathways of the inputs. Since inputs share
+    reactions, the size of this union can be smaller than the cost, hence
+    the pathways are then improved, for every reaction whose inputs all have
+    a pathway, by keeping the smaller union, as long as the union does not
+    require the metabolite it produces. These pathways are built as in
+    PathwayAssembler, hence the smallest pathway of the pathway table is
+    never larger than the upper bound, unless the pathway was not evaluated
+    (see maxnumpath in find_pathways). If both bounds are equal, the size
+    of the smallest pathway is known and the witness pathway is one of
+    the smallest pathways.
+
+    Examples
+    --------
+    >>> lower, upper, witness = find_minimum_pathway_sizes(G, seedmets)
+    >>> lower['pyr_c'], upper['pyr_c']
+    """
+    pred = graph_object.predecessors
+    succ = graph_object.successors
+    lower_bound_metabolite, status_dict, scope = forward_pass(
+        graph_object, seedmets, excluded_reactions)
+    reactions = [rxn for rxn, status in status_dict.items() if status == 'V']
+    lower_bound_size = {}
+    for metab in scope:
+        lower_bound_size[metab] = min(lower_bound_metabolite[metab]) \
+            if metab not in seedmets else 0
+    # Reactions and metabolites are indexed, so that pathways and the
+    # metabolites they require are unions of bits
+    reaction_bit = {}
+    metabolite_bit = {}
+    reaction_inputs = {}
+    reaction_products = {}
+    reactions_of_input = defaultdict(list)
+    for rxnidx, rxn in enumerate(reactions):
+        reaction_bit[rxn] = 1 << rxnidx
+        inputs = [metab for metab in pred(rxn) if metab not in seedmets]
+        for metab in inputs:
+            if metab not in metabolite_bit:
+                metabolite_bit[metab] = 1 << len(metabolite_bit)
+            reactions_of_input[metab].append(rxn)
+        reaction_inputs[rxn] = inputs
+        reaction_products[rxn] = [metab for metab in succ(rxn)
+                                  if metab not in seedmets]
+    # Pathway of every metabolite as (cost, reaction mask, input mask)
+    pathway = {}
+    missing_inputs = {}
+    heap = []
+    for rxn in reactions:
+        missing_inputs[rxn] = len(reaction_inputs[rxn])
+        if not missing_inputs[rxn]:
+            _push_hyperpath(heap, rxn, reaction_products[rxn], [],
+                            reaction_bit, metabolite_bit, pathway)
+    while heap:
+        cost, _, metab, rxnmask, inputmask = heapq.heappop(heap)
+        if metab in pathway:
+            continue
+        pathway[metab] = (cost, rxnmask, inputmask)
+        for rxn in reactions_of_input[metab]:
+            missing_inputs[rxn] -= 1
+            if not missing_inputs[rxn]:
+                _push_hyperpath(heap, rxn, reaction_products[rxn],
+                                reaction_inputs[rxn], reaction_bit,
+                                metabolite_bit, pathway)
+    # Sharing reactions between the pathways of the inputs can give smaller
+    # unions than the ones chosen by their costs. Every improvement removes
+    # a reaction from a pathway, hence the iterations stop
+    improved = True
+    while improved:
+        improved = False
+        for rxn in reactions:
+            rxnmask = reaction_bit[rxn]
+            inputmask = 0
+            for metab in reaction_inputs[rxn]:
+                rxnmask |= pathway[metab][1]
+                inputmask |= pathway[metab][2] | metabolite_bit[metab]
+            pathlen = bin(rxnmask).count('1')
+            for metab in reaction_products[rxn]:
+                if pathlen < bin(pathway[metab][1]).count('1') and \
+                        not inputmask & metabolite_bit.get(metab, 0):
+                    pathway[metab] = (pathway[metab][0], rxnmask, inputmask)
+                    improved = True
+    upper_bound_size = {}
+    witness_pathways = {}
+    for metab in scope:
+        if metab in seedmets:
+            upper_bound_size[metab] = 0
+            witness_pathways[metab] = set()
+            continue
+        rxnmask = pathway[metab][1]
+        upper_bound_size[metab] = bin(rxnmask).count('1')
+        witness_pathways[metab] = set(
+            rxn for rxn in reactions if reaction_bit[rxn] & rxnmask)
+    return lower_bound_size, upper_bound_size, witness_pathways
+
+
+def _push_hyperpath(heap, rxn, products, inputs, reaction_bit,
+                    metabolite_bit, pathway):
+    """
+    Adds the pathway made of a reaction and of the pathways of its inputs
+    to the heap of find_minimum_pathway_sizes, for every product of the
+    reaction which has no pathway yet
+    """
+    cost = 1
+    rxnmask = reaction_bit[rxn]
+    inputmask = 0
+    for metab in inputs:
+        cost += pathway[metab][0]
+        rxnmask |= pathway[metab][1]
+        inputmask |= pathway[metab][2] | metabolite_bit[metab]
+    for metab in products:
+        if metab not in pathway:
+            # The size of the union breaks ties between equal costs
+            heapq.heappush(heap, (cost, bin(rxnmask).count('1'), metab,
+                                  rxnmask, inputmask))
+
+
+def batch_forward_pass(graph_object, seed_sets):
+    """
+    This function computes the scope of a bipartite graph for several seed
+    metabolite sets (media) at once. Every metabolite and reaction holds an
+    N-bit word, where bit j is set if the node can be reached from the j-th
+    seed metabolite set. All the media are propagated together, hence a media
+    sweep costs close to one traversal of the graph instead of N.
+
+    Parameters
+    ----------
+    graph_object : NetworkX DiGraph Object or CompiledGraph
+        Bipartite graph of the metabolic network
+    seed_sets : list
+        List of N sets of seed metabolites
+
+    Returns
+    -------
+    metabolites : list
+        Names of the metabolites, in the order of the columns of scope_matrix
+    scope_matrix : numpy array
+        Boolean array of shape (N, number of metabolites), which is True if
+        the metabolite is in the scope of the seed metabolite set
+    reactions : list
+        Names of the reactions, in the order of the columns of visited_matrix
+    visited_matrix : numpy array
+        Boolean array of shape (N, number of reactions), which is True if
+        the reaction is visited from the seed metabolite set
+
+    Notes
+    -----
+    A reaction is visited for a seed metabolite set when all of its
+    predecessors are in the scope, i.e., the bits of a reaction are the
+    bitwise AND of the bits of its predecessors. The bits of a metabolite are
+    the bitwise OR of the bits of the reactions producing it. Metabolites
+    are revisited only when they gain new bits, which happens at most N
+    times. The scope of every seed metabolite set is the same as the one
+    returned by forward_pass, apart from the seed metabolites which are not
+    in the graph.
+    """
+    if not isinstance(graph_object, CompiledGraph):
+        graph_object = compile_graph(graph_object)
+    node_ids = graph_object.node_ids
+    pred, succ = graph_object.id_adjacency()
+    number_of_nodes = len(graph_object)
+    node_bits = [0] * number_of_nodes
+    for seedidx, seedmets in enumerate(seed_sets):
+        for metab in seedmets:
+            if metab in node_ids:
+                node_bits[node_ids[metab]] |= 1 << seedidx
+    # Metabolites whose bits have changed and whose reactions have to be
+    # evaluated again
+    queue = deque([nodeid for nodeid in range(number_of_nodes)
+                   if node_bits[nodeid]])
+    metabolites_in_queue = set(queue)
+    while queue:
+        metid = queue.popleft()
+        metabolites_in_queue.discard(metid)
+        for rxnid in succ(metid):
+            rxn_bits = -1
+            for precursor in pred(rxnid):
+                rxn_bits &= node_bits[precursor]
+                if not rxn_bits:
+                    break
+            new_bits = rxn_bits & ~node_bits[rxnid]
+            if new_bits:
+                node_bits[rxnid] |= new_bits
+                for product in succ(rxnid):
+                    if new_bits & ~node_bits[product]:
+                        node_bits[product] |= new_bits
+                        if product not in metabolites_in_queue:
+                            queue.append(product)
+                            metabolites_in_queue.add(product)
+    metabolite_ids = np.flatnonzero(graph_object.bipartite != 1).tolist()
+    reaction_ids = np.flatnonzero(graph_object.bipartite == 1).tolist()
+    names = graph_object.names
+    metabolites = [names[nodeid] for nodeid in metabolite_ids]
+    reactions = [names[nodeid] for nodeid in reaction_ids]
+    scope_matrix = _bits_to_matrix(node_bits, metabolite_ids, len(seed_sets))
+    visited_matrix = _bits_to_matrix(node_bits, reaction_ids, len(seed_sets))
+    return metabolites, scope_matrix, reactions, visited_matrix
+
+
+def _bits_to_matrix(node_bits, node_ids, number_of_sets):
+    """
+    This function converts the N-bit words of the nodes to a boolean matrix.
+
+    Parameters
+    ----------
+    node_bits : list
+        N-bit word of every node
+    node_ids : list
+        Identifiers of the nodes corresponding to the columns of the matrix
+    number_of_sets : int
+        Number of seed metabolite sets (N)
+
+    Returns
+    -------
+    matrix : numpy array
+        Boolean array of shape (N, number of nodes)
+    """
+    matrix = np.zeros((number_of_sets, len(node_ids)), dtype=bool)
+    for column, nodeid in enumerate(node_ids):
+        bits = node_bits[nodeid]
+        while bits:
+            lowest_bit = bits & -bits
+            matrix[lowest_bit.bit_length() - 1, column] = True
+            bits ^= lowest_bit
+    return matrix
+
+
+class IncrementalScope(object):
+    """
+    Scope of a set of seed metabolites which is updated incrementally as
+    seed metabolites are added or removed, instead of carrying out the
+    forward pass again for every change.
+
+    Parameters
+    ----------
+    graph_object : NetworkX DiGraph Object or CompiledGraph
+        Bipartite graph of the metabolic network
+    seedmets : set
+        Set of seed metabolites including the source
+
+    Notes
+    -----
+    The initial scope is computed using forward_pass. The lower bound of a
+    metabolite is the first stage of the forward pass at which it is
+    produced, and the stage of a reaction is one more than the largest lower
+    bound of its predecessors. When seed metabolites are added, only the
+    reactions that are newly visited or whose stages decrease are
+    evaluated. When seed metabolites are removed, the reactions and
+    metabolites which depend on them are retracted and only those which are
+    still supported by the rest of the scope are added back.
+
+    If a CompiledGraph is given, the stages are kept for the integer
+    identifiers of the nodes, which are traversed using id_adjacency, and
+    the names of the nodes are looked up only when the scope is returned.
+
+    Examples
+    --------
+    >>> current_scope = IncrementalScope(G, seed_metabolites)
+    >>> current_scope.add_seeds(['iJO1366 glc__D_e'])
+    >>> current_scope.lower_bound('iJO1366 pyr_c')
+    """
+
+    def __init__(self, graph_object, seedmets):
+        self.graph_object = graph_object
+        self.seedmets = set(seedmets)
+        if isinstance(graph_object, CompiledGraph):
+            self._pred, self._succ = graph_object.id_adjacency()
+            self._node_ids = graph_object.node_ids
+        else:
+            self._pred = graph_object.predecessors
+            self._succ = graph_object.successors
+            self._node_ids = None
+        lower_bound_metabolite, status_dict, scope = forward_pass(
+            graph_object, self.seedmets)
+        self._metabolite_stage = {}
+        for metab in scope:
+            self._metabolite_stage[self._key(metab)] = min(
+                lower_bound_metabolite[metab])
+        self._reaction_stage = {}
+        for rxn in status_dict:
+            rxnkey = self._key(rxn)
+            self._reaction_stage[rxnkey] = 1 + max(
+                [self._metabolite_stage[metab] for metab in self._pred(rxnkey)])
+
+    def _key(self, node):
+        """
+        Returns the key under which the stage of a node is kept, i.e., its
+        integer identifier for a CompiledGraph and its name otherwise. Seed
+        metabolites which are not in a CompiledGraph are kept by their names.
+        """
+        if self._node_ids is None:
+            return node
+        return self._node_ids.get(node, node)
+
+    def _in_graph(self, key):
+        """Returns whether the node kept under the key is in the graph"""
+        if self._node_ids is None:
+            return key in self.graph_object
+        return isinstance(key, int)
+
+    def _name(self, key):
+        """Returns the name of the node kept under the key"""
+        if self._node_ids is None or not isinstance(key, int):
+            return key
+        return self.graph_object.names[key]
+
+    @property
+    def scope(self):
+        """Set of metabolites that can be produced from the seed metabolites"""
+        return set(self._name(metab) for metab in self._metabolite_stage)
+
+    @property
+    def visited_reactions(self):
+        """Set of reactions which are visited from the seed metabolites"""
+        return set(self._name(rxn) for rxn in self._reaction_stage)
+
+    def lower_bound(self, metab):
+        """
+        Returns the minimum number of steps required to reach a metabolite,
+        or None if the metabolite is not in the scope
+        """
+        return self._metabolite_stage.get(self._key(metab))
+
+    def as_forward_pass(self):
+        """
+        Returns the current scope in the form returned by forward_pass, so
+        that it can be used in place of the results of forward_pass.
+
+        Returns
+        -------
+        lower_bound_metabolite : defaultdict
+            Minimum number of steps required to reach a metabolite
+        status_dict : defaultdict
+            Dictionary pertaining to the status of every reaction - whether it
+            has been visited or not
+        scope : set
+            Set of metabolites that can be produced from the given set of
+            seed metabolites
+        """
+        lower_bound_metabolite = defaultdict(list)
+        for metab, stage in self._metabolite_stage.items():
+            lower_bound_metabolite[self._name(metab)].append(stage)
+        status_dict = defaultdict(str)
+        for rxn in self.visited_reactions:
+            status_dict[rxn] = 'V'
+        return lower_bound_metabolite, status_dict, self.scope
+
+    def add_seeds(self, metabolites):
+        """
+        Adds seed metabolites and propagates only the reactions which are
+        newly visited or reached in fewer steps.
+
+        Parameters
+        ----------
+        metabolites : iterable
+            Metabolites to be added to the seed metabolite set
+
+        Returns
+        -------
+        None
+        """
+        heap = []
+        for metab in set(metabolites) - self.seedmets:
+            self.seedmets.add(metab)
+            metab = self._key(metab)
+            if self._metabolite_stage.get(metab) != 0:
+                self._metabolite_stage[metab] = 0
+                # Seed metabolites which are not in the graph do not take
+                # part in any reaction
+                if self._in_graph(metab):
+                    heapq.heappush(heap, (0, metab))
+        self._propagate(heap)
+
+    def remove_seeds(self, metabolites):
+        """
+        Removes seed metabolites and retracts only the reactions and
+        metabolites which are no longer supported.
+
+        Parameters
+        ----------
+        metabolites : iterable
+            Metabolites to be removed from the seed metabolite set
+
+        Returns
+        -------
+        None
+        """
+        removed = set(metabolites) & self.seedmets
+        if not removed:
+            return
+        self.seedmets -= removed
+        seed_keys = set(self._key(metab) for metab in self.seedmets)
+        pred = self._pred
+        succ = self._succ
+        # All the reactions and metabolites which may depend on the removed
+        # seed metabolites are retracted first
+        affected_metabolites = set(self._key(metab) for metab in removed)
+        affected_reactions = set()
+        stack = list(affected_metabolites)
+        while stack:
+            metab = stack.pop()
+            if not self._in_graph(metab):
+                continue
+            for rxn in succ(metab):
+                if rxn in self._reaction_stage and rxn not in affected_reactions:
+                    affected_reactions.add(rxn)
+                    for product in succ(rxn):
+                        if product not in seed_keys and \
+                                product not in affected_metabolites:
+                            affected_metabolites.add(product)
+                            stack.append(product)
+        for metab in affected_metabolites:
+            self._metabolite_stage.pop(metab, None)
+        for rxn in affected_reactions:
+            del self._reaction_stage[rxn]
+        # The retracted metabolites which are still produced by a reaction
+        # in the scope are added back, and the changes are propagated
+        heap = []
+        for metab in affected_metabolites:
+            if not self._in_graph(metab):
+                continue
+            for rxn in pred(metab):
+                if rxn in self._reaction_stage:
+                    self._update_metabolite(metab, self._reaction_stage[rxn], heap)
+        for rxn in affected_reactions:
+            self._update_reaction(rxn, heap)
+        self._propagate(heap)
+
+    def _propagate(self, heap):
+        """
+        Propagates the metabolites whose stages have decreased, in the
+        increasing order of their stages.
+
+        Parameters
+        ----------
+        heap : list
+            Heap of (stage, metabolite) pairs to be propagated
+
+        Returns
+        -------
+        None
+        """
+        succ = self._succ
+        while heap:
+            stage, metab = heapq.heappop(heap)
+            if self._metabolite_stage.get(metab) != stage:
+                # An older entry of a metabolite reached in fewer steps
+                continue
+            for rxn in succ(metab):
+                self._update_reaction(rxn, heap)
+
+    def _update_reaction(self, rxn, heap):
+        """
+        Visits a reaction if all of its predecessors are in the scope and
+        updates the stages of its products if it is reached in fewer steps.
+        """
+        stage = 0
+        for metab in self._pred(rxn):
+            if metab not in self._metabolite_stage:
+                return
+            stage = max(stage, self._metabolite_stage[metab])
+        stage += 1
+        if stage < self._reaction_stage.get(rxn, float('inf')):
+            self._reaction_stage[rxn] = stage
+            for product in self._succ(rxn):
+                self._update_metabolite(product, stage, heap)
+
+    def _update_metabolite(self, metab, stage, heap):
+        """
+        Updates the stage of a metabolite if it is reached in fewer steps.
+        """
+        if stage < self._metabolite_stage.get(metab, float('inf')):
+            self._metabolite_stage[metab] = stage
+            heapq.heappush(heap, (stage, metab))
+
+
+def _add_to_scope(metabolite, scope, succ, missing_precursors):
+    """
+    This function adds a metabolite to the scope and updates the number of
+    missing precursors of the reactions it participates in.
+
+    Parameters
+    ----------
+    metabolite : str
+        Metabolite which has been produced
+    scope : set
+        Set of metabolites that can be produced so far
+    succ : function
+        Successors of a node in the bipartite graph
+    missing_precursors : dict
+        Number of precursors of every reaction which are not in the scope
+
+    Returns
+    -------
+    None
+    """
+    if metabolite not in scope:
+        scope.add(metabolite)
+        for rxn in succ(metabolite):
+            # Reactions which have not been looked at yet are counted
+            # against the scope when they are first needed
+            if rxn in missing_precursors:
+                missing_precursors[rxn] -= 1
+
+
+def _count_missing_precursors(rxn, pred, scope, missing_precursors):
+    """
+    This function returns the number of precursors of a reaction that are
+    not in the scope. The count is computed only once for every reaction and
+    is kept up to date by _add_to_scope.
+
+    Parameters
+    ----------
+    rxn : str
+        Reaction which is evaluated
+    pred : function
+        Predecessors of a node in the bipartite graph
+    scope : set
+        Set of metabolites that can be produced so far
+    missing_precursors : dict
+        Number of precursors of every reaction which are not in the scope
+
+    Returns
+    -------
+    int
+        Number of precursors of the reaction not in the scope
+    """
+    if rxn not in missing_precursors:
+        missing_precursors[rxn] = sum(
+            1 for metab in pred(rxn) if metab not in scope)
+    return missing_precursors[rxn]
+
+
+def _add_stage(stages, stage):
+    """
+    Appends the stage to the list of stages at which a metabolite is
+    produced, if it has not been added already. Stages are always added in
+    increasing order, hence only the last entry is checked.
+    """
+    if not stages or stages[-1] != stage:
+        stages.append(stage)
@@ -108,7 +108,6 @@ def find_stuck_rxns(model, community, seedmet_file, no_of_orgs):
     """
 
     warnings.filterwarnings("ignore")
-    G, full_name_map = mq.construct_graph.create_graph(community, no_of_orgs)
     if not os.path.exists('results'):
         os.makedirs('results')
 
@@ -120,18 +119,27 @@ def find_stuck_rxns(model, community, seedmet_file, no_of_orgs):
     org_info = {}
     scope = {}
     vis = {}
-    print('No. of graphs constructed: ', len(G))
-
-    # This loop finds all the stuck reaction
-
-    for i in range(len(all_possible_combis)):
-        lbm, sd, s = mq.guided_bfs.forward_pass(G[i], seedmets)
+    full_name_map = {}
+    number_of_graphs = 0
+
+    # This loop finds all the stuck reaction. The graphs are created one at
+    # a time, and every graph is discarded once it has been analysed
+
+    for i, (combination, graph, namemap) in enumerate(
+            mq.construct_graph.iter_graphs(community, no_of_orgs)):
+        # The names of the internal reactions are shared by all the graphs,
+        # only the names of the exchange reactions are new in every graph
+        if i == 0:
+            full_name_map.update(namemap.maps[1])
+        full_name_map.update(namemap.maps[0])
+        number_of_graphs = i + 1
+        lbm, sd, s = mq.guided_bfs.forward_pass(graph, seedmets)
         for j in range(len(all_possible_combis[i])):
             stuck = []
             rxnNode = []
             model1 = model[all_possible_combis[i][j]].id
             visited = list(sd.keys())
-            for r in G[i].nodes:
+            for r in graph.nodes:
                 if r.find(model1) >= 0:
                     rxnNode.append(r)
             for rxn in rxnNode:
@@ -146,6 +154,7 @@ def find_stuck_rxns(model, community, seedmet_file, no_of_orgs):
             org_info[model1 + '_' + model2] = stuck
             scope[model1 + '_' + model2] = s
             vis[model1 + '_' + model2] = visited
+    print('No. of graphs constructed: ', number_of_graphs)
     return org_info, scope, full_name_map, vis
 
 
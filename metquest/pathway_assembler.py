@@ -2,29 +2,46 @@
 
 from __future__ import absolute_import
 
+import os
+import sys
 import math
+import pickle
+import hashlib
 import itertools
 import time
+import multiprocessing
+from multiprocessing.connection import wait
 from numpy import prod
 from networkx import get_node_attributes
-from metquest.guided_bfs import forward_pass
+from metquest.guided_bfs import forward_pass, backward_pass, \
+    find_minimum_pathway_sizes
+from metquest.compiled_graph import CompiledGraph
 from metquest.generate_partitions import generate_partitions
+from metquest.table_store import MemoryTableStore
 
+# Types of the two directions of the reactions split by fetch_reactions and
+# construct_graph
+_REVERSIBLE_TWIN_TYPES = {'RR': 'RevBR', 'RevBR': 'RR', 'ER': 'ERR',
+                          'ERR': 'ER', 'NCER': 'NCERR', 'NCERR': 'NCER'}
 
-def find_pathways(G, seed_mets_input, path_len_cutoff, *args):
+
+def find_pathways(G, seed_mets_input, path_len_cutoff, *args, maxnumpath=1000,
+                  n_jobs=1, targets=None, table_store=None, checkpoint_file=None,
+                  time_limit=None, memory_limit=None, prune_reversible_pairs=False,
+                  return_incomplete_column=False):
     """
     This function tries to identify pathways between a set of seed and
     target metabolites of a given size cut-off.
 
     Parameters
     ----------
-    G : NetworkX DiGraph Object
+    G : NetworkX DiGraph Object or CompiledGraph
         Bipartite graph of the metabolic network
     seed_mets_input : set
         Set of seed metabolites including the source
     path_len_cutoff : int
         Maximum size of the pathways
-    *args
+    maxnumpath : int
         Used to decide if a particular combination has to be evaluated or not.
         i.e., if the number of pathways produced for two different metabolites
         are higher, for instance, if in the reaction A + B -> C,
@@ -32,7 +49,36 @@ def find_pathways(G, seed_mets_input, path_len_cutoff, *args):
         at the maximum. If this pathway cutoff (maxnumpath) is 1000,
         this combination will not be evaluated, provided C has been
         already found.
-        By default, it is set to 1000
+        By default, it is set to 1000. It can also be given after
+        path_len_cutoff, as an additional positional argument
+    n_jobs : int
+        Number of processes used to fill every column of the pathway table.
+        If -1, all the processors are used. By default, it is set to 1
+    targets : iterable
+        Target metabolites. If given, the pathway table is filled only for
+        the metabolites and the reactions which take part in producing the
+        targets. By default, all the metabolites in the scope are evaluated
+    table_store : MemoryTableStore or SQLiteTableStore
+        Storage of the pathway table while it is filled. See PathwayAssembler
+    checkpoint_file : str
+        Name of the file to which the state of the calculations is written
+        after every column, so that they can be continued with
+        resume_pathways. By default, no checkpoint is written
+    time_limit : float
+        Time (in seconds) after which the calculations are stopped, and the
+        tables of the columns completed until then are returned.
+        By default, there is no limit
+    memory_limit : float
+        Memory (resident set size of the process, in MB) beyond which the
+        calculations are stopped, and the tables of the columns completed
+        until then are returned. By default, there is no limit
+    prune_reversible_pairs : bool
+        If True, pathways containing both directions of a reversible
+        reaction are not formed. See PathwayAssembler. By default, it is
+        set to False
+    return_incomplete_column : bool
+        If True, the column which was being filled when a limit was reached
+        is returned after the scope. By default, it is set to False
 
     Returns
     -------
@@ -45,319 +91,1815 @@ def find_pathways(G, seed_mets_input, path_len_cutoff, *args):
         identified for every metabolite.
     scope : set
         Set of metabolites which can be synthesised
-    """
+    incomplete_column : int
+        Only returned if return_incomplete_column is True. Pathway length
+        which was being filled when the time or memory limit was reached, or
+        None if the table was filled up to the cut-off
 
-    global succ, pred, lower_bound_metabolite, maxnumpath, seedmets, \
-        pathway_table, cyclic_pathways
-    pathway_table = {}
-    cyclic_pathways = {}
+    Notes
+    -----
+    This function is a wrapper around PathwayAssembler, which holds the
+    state of the calculations.
+
+    If a limit is reached, a message is printed and the tables returned are
+    the ones that would be obtained with the cut-off of the last completed
+    column, i.e., incomplete_column - 1.
+    """
     tic = time.perf_counter()
     #  Setting the cutoff for maximum number of pathways
-    if args:
-        for maxnumpath_input in args:
-            maxnumpath = maxnumpath_input
-    else:
-        maxnumpath = 1000
-    # DiGraph definitions successors and predecessors
-    succ = G.successors
-    pred = G.predecessors
-    seedmets = seed_mets_input
-    # Removing reactions whose reactants are more than 5
-    node_attributes = get_node_attributes(G, 'bipartite')
-    node_attributes_inverted_dict = {}
-    # 0 metabolites , 1 are reactions
-    for keys, values in node_attributes.items():
-        node_attributes_inverted_dict[values] = \
-            node_attributes_inverted_dict.get(values, [])
-        node_attributes_inverted_dict[values].append(keys)
-    # If the number of metabolites, apart from the ones provided
-    # in seed are greater than 5, such reactions are removed
-    for rxnstoremove in node_attributes_inverted_dict[1]:
-        if len(set(pred(rxnstoremove)) - seedmets) >= 5:
-            G.remove_node(rxnstoremove)
-    # Performing guided BFS on directed graph by calling forward_pass
-    lower_bound_metabolite, status_dict, scope = forward_pass(G, seedmets)
-    # Sorting the keys (reactions) in the status dictionary,
-    # since dictionary keys are not good to iterate over.
-    # There could be differences in the order of insertion of
-    # dictionary keys. Although, this does not matter with the
-    # algorithm implementation.
-    rxns_to_visit = list(status_dict.keys())
-    rxns_to_visit.sort()
-    # For seed metabolites, the pathway table is initialised to 0
-    for seedmetabs in list(seedmets):
-        pathway_table[seedmetabs] = {0: ''}
-    # Status dict consists of all the reactions that can be
-    # visited from the seed metabolites
-    for rxns in rxns_to_visit:
-        if set(pred(rxns)).issubset(seedmets):
-            # Initialisation of dictionary with the
-            # metabolites produced with one rxn
-            for metssucc in succ(rxns):
-                if metssucc not in pathway_table:
-                    pathway_table[metssucc] = {1: []}
-            # Filling table with one reaction that produced metabolite
-            for metssucc in succ(rxns):
-                # Since we don't want pathways generating seed metabolites
-                if metssucc not in seedmets:
-                    pathway_table[metssucc][1].append(set([rxns]))
-
-    # For filling values from the second column
-    for currentcolumnidx in range(2, path_len_cutoff+1):
-        for rxns in status_dict:  # rxns_to_visit:
-            # To eliminate seed metabolites, whose column value
-            # is always 0 - so that more partitions are not generated.
-            mets_needed = list(set(pred(rxns)) - seedmets)
-            # To only go over reactions whose inputs are not
-            # seed metabolites. There could be reactions whose inputs
-            # are only seed mets, eg atp + h2o
-            if mets_needed:
-                for val in range(currentcolumnidx-1,
-                                 len(mets_needed)*(currentcolumnidx-1)+1):
-                    if val <= len(mets_needed)*(currentcolumnidx-2):
-                        _first_round_calculations(
-                            mets_needed, currentcolumnidx, rxns, val)
-                    else:
-                        _second_round_calculations(
-                            mets_needed, currentcolumnidx, rxns, val)
+    for maxnumpath_input in args:
+        maxnumpath = maxnumpath_input
+    assembler = PathwayAssembler(G, seed_mets_input, maxnumpath, n_jobs,
+                                  targets, table_store, prune_reversible_pairs)
+    assembler.checkpoint_file = checkpoint_file
+    if not assembler.run(path_len_cutoff, time_limit, memory_limit):
+        print('The pathways returned are the ones of size cut-off',
+              assembler.completed_column)
+    pathway_table = assembler.get_pathway_table()
+    cyclic_pathways = assembler.get_cyclic_pathways()
     toc = time.perf_counter()
     timetaken = toc - tic
     print('Time taken', timetaken)
-    return pathway_table, cyclic_pathways, scope
+    if return_incomplete_column:
+        return pathway_table, cyclic_pathways, assembler.scope, \
+            assembler.incomplete_column
+    return pathway_table, cyclic_pathways, assembler.scope
 
 
-def _first_round_calculations(mets_needed, currentcolumnidx, rxns, val):
+def count_pathways(G, seed_mets_input, path_len_cutoff, maxnumpath=1000,
+                   exact=True, targets=None):
     """
-    This function takes as input metabolites required by the reaction,
-    current column index (pathway length) which we are trying to fill,
-    the current reaction which we are considering and the sum that we
-    need to generate. This function tries to calculate the upper limit
-    on the number of inputs that can take the value of (k-1) and generate
-    partitions which have not been previously generated. For more
-    details, please refer main manuscript (Algorithm 1 - Lines 14-19)
+    This function counts the pathways of every size producing the
+    metabolites.
 
     Parameters
     ----------
-    mets_needed : list
-        List of metabolites a reaction requires
-    currentcolumnidx : int
-        An integer denoting the current column which is evaluated
-    rxns : str
-        Current reaction which is evaluated
-    val : int
-        Maximum sum that is to be generated
+    G : NetworkX DiGraph Object or CompiledGraph
+        Bipartite graph of the metabolic network
+    seed_mets_input : set
+        Set of seed metabolites including the source
+    path_len_cutoff : int
+        Maximum size of the pathways
+    maxnumpath : int
+        Used to decide if a particular combination has to be evaluated or
+        not. See find_pathways
+    exact : bool
+        If True, the number of distinct branched pathways is returned. If
+        False, the counts of count_partition_combinations are returned
+        instead, which are not numbers of pathways. By default, it is set
+        to True
+    targets : iterable
+        Target metabolites. If given, only the metabolites which take part
+        in producing the targets are counted
 
     Returns
     -------
-    None
+    pathway_counts : dict
+        Dictionary of dictionary containing the number of pathways of
+        different sizes identified for every metabolite. Seed metabolites
+        have one pathway of size 0
+
+    Notes
+    -----
+    The counts are the number of pathways in the pathway table returned by
+    find_pathways, including the pathways larger than the cut-off, which
+    are obtained from the reaction masks of the pathways (see
+    PathwayAssembler.count_pathways). The pathways of the size of the
+    cut-off or larger, which are most of the table since their number grows
+    with the size, are not combined by any column up to the cut-off, hence
+    only their reaction masks are kept, to count the distinct ones. The
+    pathways smaller than the cut-off are kept as by find_pathways.
     """
+    if not exact:
+        return count_partition_combinations(G, seed_mets_input,
+                                            path_len_cutoff, targets)
+    assembler = PathwayAssembler(G, seed_mets_input, maxnumpath,
+                                 targets=targets)
+    return assembler.count_pathways(path_len_cutoff)
 
-    # Line 15 in the algorithm - Upper limit on the number of
-    # inputs that can take the value of (k-1)
-    optimized_val = int(math.floor(val/((currentcolumnidx-1))))
-    for currentval in range(1, optimized_val+1):
-        # GENERATING COMBINATIONS
-        # This will give combinations of  metabolites whose size is
-        # defined by currentval
-        for currentmetcomb in itertools.combinations(mets_needed, currentval):
-            temp_rxn_list = []
-            number_of_pathways_found = {}
-            onemetnotfound = ''
-            for metabolites in list(currentmetcomb):
-                if metabolites in pathway_table:
-                    # To ensure that the current iteration uses metabs
-                    # generated only till the previous iteration
-                    if currentcolumnidx - 1 in pathway_table[metabolites]:
-                        temp_rxn_list.append([[rxns]])
-                        number_of_pathways_found[metabolites] = \
-                            len(pathway_table[metabolites][currentcolumnidx-1])
-                    else:
-                        # Because one of the metabolites is not found,
-                        # hence breaks out of the second loop
-                        onemetnotfound = 'Y'
-                        break
-            if onemetnotfound != 'Y':
-                other_mets_not_in_comb = list(set(mets_needed) - set(currentmetcomb))
-                if set(currentmetcomb).issubset(pathway_table):
-                    for mets in currentmetcomb:
-                        # Assigning the value of columnindex -1
-                        # to the metabolites in current metabolite combination
-                        temp_rxn_list.append(pathway_table[mets][currentcolumnidx-1])
-
-                    first_discovery_step = []
-                    # This will give values of the lower bound of
-                    # metabolites which are not involved in combination
-                    for varmet in list(other_mets_not_in_comb):
-                        first_discovery_step.append(min(lower_bound_metabolite[varmet]))
-                    all_partitions = generate_partitions(val-((currentcolumnidx-1)*currentval),
-                                                         first_discovery_step, currentcolumnidx - 1)
-                    for partitions in all_partitions:
-                        _find_all_rxn_combination_firstround(rxns, partitions, other_mets_not_in_comb,
-                                                             temp_rxn_list, number_of_pathways_found,
-                                                             currentcolumnidx)
-
-
-def _find_all_rxn_combination_firstround(rxns, partitions, other_mets_not_in_comb,
-                                        temp_rxn_list, number_of_pathways_found, currentcolumnidx):
+
+def count_partition_combinations(G, seed_mets_input, path_len_cutoff,
+                                 targets=None):
     """
-    This function fetches the pathways from the table corresponding to
-    the entries in partition generated.
+    This function counts, for every metabolite and size, the number of ways
+    of combining the reactions which produce the metabolite, without
+    filling the pathway table.
 
     Parameters
     ----------
-    rxns : str
-        Current reaction which is evaluated
-    paritions : tuple
-        Combinations of numbers that would geenrate the required sum
-    other_mets_not_in_comb : list
-        other metabolites participating in the reaction for which a
-        number from the partition has not been assigned yet
-    temp_rxn_list : list
-        a list consisting of all pathways that generated the metabolite
-        for which the value of (k-1) is assigned
-    number_of_pathways_found : dict
-        number of pathways found for the metabolite evaluated
-    currentcolumnidx : int
-         value of the current column index (pathway length)
+    G : NetworkX DiGraph Object or CompiledGraph
+        Bipartite graph of the metabolic network
+    seed_mets_input : set
+        Set of seed metabolites including the source
+    path_len_cutoff : int
+        Maximum size of the combinations
+    targets : iterable
+        Target metabolites. If given, only the metabolites which take part
+        in producing the targets are counted
 
     Returns
     -------
-    None
+    combination_counts : dict
+        Dictionary of dictionary containing the number of combinations of
+        different sizes for every metabolite. Seed metabolites have one
+        combination of size 0
+
+    Notes
+    -----
+    The number of combinations of size k of a metabolite is the sum, over
+    the reactions producing it and over the partitions of k - 1 among the
+    inputs of the reaction, of the product of the number of combinations of
+    every input. The size of a combination is the sum of the sizes of the
+    combinations of the inputs plus one, and not the number of distinct
+    reactions in their union, and the maxnumpath heuristic is not applied.
+    These counts are therefore not comparable to the pathway tables of
+    find_pathways or to count_pathways: the same pathway may be counted many
+    times, under sizes larger than its number of reactions, and no size
+    above the cut-off is counted. They only need a number for every
+    metabolite and size, and indicate how fast the combinations grow.
     """
-    # To check if all the other metabolites required by that reaction
-    # can be generated using the partitions.
-    counter = 0
-    more_pathways_found = ''
-    for varmetidx in range(len(other_mets_not_in_comb)):
-        if other_mets_not_in_comb[varmetidx] in pathway_table:
-            # checking if the pathway table consists of values from the
-            # current partition for the input metabolite
-            if partitions[varmetidx] in pathway_table[other_mets_not_in_comb[varmetidx]]:
-                counter += 1
-                number_of_pathways_found[other_mets_not_in_comb[varmetidx]] = \
-                    len(pathway_table[other_mets_not_in_comb[varmetidx]][partitions[varmetidx]])
-    if counter == len(other_mets_not_in_comb):
-        if all([prod(list(number_of_pathways_found.values())) > maxnumpath,
-                set(succ(rxns)).issubset(set(pathway_table))]):
-            more_pathways_found = 'Y'
-        else:
-            # Deep copy of the reaction list, because temp_rxn_list_current
-            # varies with every iteration to evaluate other partitions
-            temp_rxn_list_current = temp_rxn_list[:]
-            for varmetidx in range(len(other_mets_not_in_comb)):
-                temp_rxn_list_current.append(
-                    pathway_table[other_mets_not_in_comb[varmetidx]][partitions[varmetidx]])
-            _populate_table(rxns, temp_rxn_list_current, currentcolumnidx)
+    assembler = PathwayAssembler(G, seed_mets_input, targets=targets)
+    return assembler.count_partition_combinations(path_len_cutoff)
 
 
-def _populate_table(rxns, temp_rxn_list_current, currentcolumnidx):
+def iter_pathways(G, seed_mets_input, target, path_len_cutoff, maxnumpath=1000):
     """
-    This function fills in the entry in the main pathway table. It also
-    evaluates the pathways and identifies if its cyclic. If the
-    pathway is a cyclic pathway, it is stored separately, and is not
-    used in the subsequent calculations.
+    This function generates the pathways of sizes less than or equal to the
+    cut-off producing the target metabolite, as soon as all the pathways of
+    a size have been found.
 
     Parameters
     ----------
-    rxns : str
-        Current reaction which is evaluated
-    paritions : tuple
-        Combinations of numbers that would geenrate the required sum
-    temp_rxn_list_current : list of lists
-        a list of lists consisting of all the alternate pathways
-        producing the metabolites required by the reaction
-    currentcolumnidx : int
-         value of the current column index (pathway length)
+    G : NetworkX DiGraph Object or CompiledGraph
+        Bipartite graph of the metabolic network
+    seed_mets_input : set
+        Set of seed metabolites including the source
+    target : str
+        Target metabolite
+    path_len_cutoff : int
+        Maximum size of the pathways
+    maxnumpath : int
+        Used to decide if a particular combination has to be evaluated or
+        not. See find_pathways
+
+    Yields
+    ------
+    pathlen : int
+        Size of the pathway
+    pathway : set
+        Set of reactions in the pathway
+
+    Notes
+    -----
+    The pathway table is filled only for the metabolites which take part
+    in producing the target (see PathwayAssembler), and its pathways are
+    stored as reaction masks. The sets of reactions are created only for
+    the pathways of the target, one at a time.
+
+    Examples
+    --------
+    >>> for pathlen, pathway in iter_pathways(G, seed_metabolites, target, 15):
+    ...     print(pathlen, sorted(pathway))
+    """
+    assembler = PathwayAssembler(G, seed_mets_input, maxnumpath,
+                                 targets=[target])
+    for pathlen, pathway in assembler.iter_pathways(target, path_len_cutoff):
+        yield pathlen, pathway
+
+
+def resume_pathways(G, seed_mets_input, path_len_cutoff, checkpoint_file):
+    """
+    This function continues the calculations of find_pathways from the
+    checkpoint written after the last completed column.
+
+    Parameters
+    ----------
+    G : NetworkX DiGraph Object or CompiledGraph
+        Bipartite graph of the metabolic network, which must be the graph
+        used when the checkpoint was written
+    seed_mets_input : set
+        Set of seed metabolites including the source, which must be the
+        seed metabolites used when the checkpoint was written
+    path_len_cutoff : int
+        Maximum size of the pathways
+    checkpoint_file : str
+        Name of the checkpoint file, which is updated after every column
 
     Returns
     -------
-    None
+    pathway_table : dict
+        Dictionary of dictionary containing the pathways of different sizes
+        identified for every metabolite. This will have only the acyclic/
+        branched pathways.
+    cyclic_pathways : dict
+        Dictionary of dictionary containing cyclic pathways of different sizes
+        identified for every metabolite.
+    scope : set
+        Set of metabolites which can be synthesised
+
+    Notes
+    -----
+    If the graph or the seed metabolites are not the ones used when the
+    checkpoint was written, the calculations are not resumed and None is
+    returned.
     """
-    #  Temprxnlist consists of all combinations of pathways
-    #  producing all the input metabolites
-    for rxnunion in itertools.product(*temp_rxn_list_current):
-        reaction_combntn = set([])
-        for rxnentry in rxnunion:
-            for individualele in rxnentry:
-                reaction_combntn.add(individualele)
-        metabs_in_cycle = set([])
-
-        for currentrxn in reaction_combntn:
-            for inputmetab in pred(currentrxn):
-                if inputmetab not in seedmets:
-                    metabs_in_cycle.add(inputmetab)
-        for succmets in succ(rxns):
-            if succmets not in seedmets:
-                if len(reaction_combntn) >= currentcolumnidx:
-                    if succmets in pathway_table:
-                        if succmets in metabs_in_cycle:
-                            if succmets in cyclic_pathways:
-                                cyclic_pathways[succmets].update(
-                                    {len(reaction_combntn): [list(reaction_combntn)]})
-                            else:
-                                cyclic_pathways[succmets] = \
-                                    {len(reaction_combntn): [list(reaction_combntn)]}
-                        else:
-                            if len(reaction_combntn) in pathway_table[succmets]:
-                                try:
-                                    if pathway_table[succmets][len(reaction_combntn)]. \
-                                                                index(reaction_combntn):
-                                        pass  # Because this entry is already in the pathway_table
-                                except ValueError:
-                                    pathway_table[succmets][len(reaction_combntn)].append(
-                                        reaction_combntn)
-                            else:
-                                pathway_table[succmets].update(
-                                    {len(reaction_combntn): [reaction_combntn]})
+    tic = time.perf_counter()
+    assembler = PathwayAssembler.load_checkpoint(checkpoint_file, G,
+                                                 seed_mets_input)
+    if assembler is None:
+        return None
+    print('Resuming from pathway length', assembler.completed_column + 1)
+    assembler.checkpoint_file = checkpoint_file
+    assembler.run(path_len_cutoff)
+    pathway_table = assembler.get_pathway_table()
+    cyclic_pathways = assembler.get_cyclic_pathways()
+    toc = time.perf_counter()
+    timetaken = toc - tic
+    print('Time taken', timetaken)
+    return pathway_table, cyclic_pathways, assembler.scope
+
+
+def graph_fingerprint(G):
+    """
+    Returns a SHA-256 digest of the nodes and the edges of the graph, in
+    their order
+    """
+    digest = hashlib.sha256()
+    for node in G.nodes():
+        digest.update(node.encode('utf-8') + b'\0')
+    digest.update(b'\1')
+    for node, succnode in G.edges():
+        digest.update(node.encode('utf-8') + b'\0' + succnode.encode('utf-8') + b'\0')
+    return digest.hexdigest()
 
-                    else:
-                        pathway_table[succmets] = {len(reaction_combntn): [reaction_combntn]}
 
-def _second_round_calculations(mets_needed, currentcolumnidx, rxns, val):
+def seed_fingerprint(seed_mets_input):
     """
-    This function takes into account all the metabolites required by the
-    reaction and based on the partition of numbers, fetches the values
-    from the pathway table. Since there can be multiple alternate
-    routes to produce the same metabolite, this function makes a list
-    of all possible pathways (of the given size) that produces this
-    metabolite of interest.
+    Returns a SHA-256 digest of the seed metabolites
+    """
+    digest = hashlib.sha256()
+    for metab in sorted(seed_mets_input):
+        digest.update(metab.encode('utf-8') + b'\0')
+    return digest.hexdigest()
+
+
+def find_k_shortest_pathways(G, seed_mets_input, target, k,
+                             path_len_cutoff=None, maxnumpath=1000):
+    """
+    This function finds the k smallest branched pathways producing the
+    target metabolite, without filling the pathway table beyond the size of
+    the k-th pathway.
 
     Parameters
     ----------
-    mets_needed : list
-        List of metabolites a reaction requires
-    currentcolumnidx : int
-        An integer denoting the current column which is evaluated
-    rxns : str
-        Current reaction which is evaluated
-    val : int
-        Maximum sum that is to be generated
+    G : NetworkX DiGraph Object or CompiledGraph
+        Bipartite graph of the metabolic network
+    seed_mets_input : set
+        Set of seed metabolites including the source
+    target : str
+        Target metabolite
+    k : int
+        Number of pathways to be found
+    path_len_cutoff : int
+        Maximum size of the pathways. By default, the pathway table is
+        filled until k pathways are found or no larger pathway can be found
+    maxnumpath : int
+        Used to decide if a particular combination has to be evaluated or
+        not. See find_pathways
 
     Returns
     -------
-    None
+    shortest_pathways : list
+        List of pairs of the size and the set of reactions of the pathways,
+        in increasing order of the sizes. There are fewer than k pathways if
+        the target cannot be produced by k pathways within the cut-off
+
+    Notes
+    -----
+    The pathway table is filled one size at a time, for the metabolites
+    taking part in producing the target (see iter_pathways), hence all the
+    pathways of a size are found before any larger pathway. The columns
+    smaller than the lower bound of the target from the forward pass do not
+    produce any pathway of the target. Among the pathways of the size of the
+    k-th pathway, the ones found first are returned. A single pathway is
+    returned without filling the table when its size is known from the
+    bounds of find_minimum_pathway_sizes.
     """
-    first_discovery_step = []
-    for predmets in mets_needed:
-        first_discovery_step.append(min(lower_bound_metabolite[predmets]))
-    all_partitions = generate_partitions(val, first_discovery_step, currentcolumnidx-1)
-    for partitions in all_partitions:
-        temp_rxn_list = []
-        number_of_pathways_found = {}
-        more_pathways_found = ''
-        counter_new = 0
-        temp_rxn_list.append([[rxns]])
-        for item in range(len(mets_needed)):
-            if mets_needed[item] in pathway_table:
-                if partitions[item] in pathway_table[mets_needed[item]]:
-                    number_of_pathways_found[mets_needed[item]] = \
-                        len(pathway_table[mets_needed[item]][partitions[item]])
-                    counter_new += 1
-        if counter_new == len(mets_needed):
-            if all([prod(list(number_of_pathways_found.values())) > maxnumpath,
-                    set(succ(rxns)).issubset(set(pathway_table))]):
-                more_pathways_found = 'NA'
-            else:
+    assembler = PathwayAssembler(G, seed_mets_input, maxnumpath,
+                                 targets=[target])
+    return assembler.find_shortest_pathways(target, k, path_len_cutoff)
+
+
+class PathwayAssembler(object):
+    """
+    This class identifies the pathways between a set of seed metabolites
+    and all the metabolites in their scope, by filling the pathway table
+    one column (pathway length) at a time.
+
+    All the state of the calculations is held by the object, hence
+    different objects can be used from different threads, and an object
+    can be pickled to be sent to another process.
+
+    Parameters
+    ----------
+    G : NetworkX DiGraph Object or CompiledGraph
+        Bipartite graph of the metabolic network
+    seed_mets_input : set
+        Set of seed metabolites including the source
+    maxnumpath : int
+        Used to decide if a particular combination has to be evaluated or
+        not. See find_pathways. By default, it is set to 1000
+    n_jobs : int
+        Number of processes used to fill every column of the pathway table.
+        If -1, all the processors are used. By default, it is set to 1
+    targets : iterable
+        Target metabolites. If given, the pathway table is filled only for
+        the metabolites and the reactions which take part in producing the
+        targets. By default, all the metabolites in the scope are evaluated
+    table_store : MemoryTableStore or SQLiteTableStore
+        Storage of the pathway table. An SQLiteTableStore keeps the table in
+        a file, so that it can be larger than the memory. By default, the
+        table is held in memory
+    prune_reversible_pairs : bool
+        If True, pathways containing both directions of a reversible
+        reaction are not formed. By default, it is set to False
+
+    Attributes
+    ----------
+    lower_bound_metabolite : defaultdict
+        Minimum number of steps required to reach a metabolite
+    status_dict : defaultdict
+        Dictionary of the reactions visited by the forward pass
+    scope : set
+        Set of metabolites which can be synthesised
+    excluded_reactions : set
+        Reactions which require five or more metabolites apart from the
+        seed metabolites, and are not evaluated
+    completed_column : int
+        Largest pathway length for which the table has been filled
+    incomplete_column : int
+        Pathway length which was being filled when the calculations were
+        stopped by the time or memory limit, or None
+    checkpoint_file : str
+        If set, the state of the calculations is written to this file after
+        every column (see save_checkpoint)
+
+    Notes
+    -----
+    Reactions which require five or more metabolites apart from the seed
+    metabolites are excluded from the calculations. G is not modified, hence
+    the same graph can be shared by objects used from different threads.
+
+    When n_jobs is greater than 1, the reactions of every column are split
+    across processes, which are started once for every call to run. The
+    processes hold a copy of the table, to which only the pathways added by
+    every column are sent. They only send the pathways which can change the
+    table, reaction by reaction, and these are merged into the table in the
+    order of the reactions, hence the pathway table is the same as the one
+    filled by a single process.
+
+    When targets are given, the reactions visited by the forward pass are
+    walked backwards from the targets (see backward_pass), and only the
+    reactions and metabolites found are evaluated. The pathways of a
+    reaction are then skipped by the maxnumpath heuristic when all of its
+    products which take part in producing the targets have been found,
+    hence the tables may have more pathways than without targets when the
+    heuristic is used.
+
+    The reversible reactions of the models are split into a forward (RR)
+    and a backward (RevBR) reaction, and the exchange reactions into an
+    export (ER, NCER) and an import (ERR, NCERR) reaction, with the same
+    number (see fetch_reactions and construct_graph). When
+    prune_reversible_pairs is set, the two directions of such a reaction
+    are given adjacent bits, and the combinations of pathways are united
+    one input at a time, so that combinations holding both directions are
+    rejected as soon as they appear, instead of being formed by the
+    Cartesian product. Such pathways are futile cycles, but they are not
+    always cyclic for the metabolite produced, hence the tables are then
+    smaller than the default ones.
+
+    Examples
+    --------
+    >>> assembler = PathwayAssembler(G, seed_metabolites)
+    >>> assembler.run(15)
+    >>> pathway_table = assembler.get_pathway_table()
+    >>> pathway_table_10 = assembler.get_pathway_table(10)
+    >>> assembler.run(20)  # Resumes from the 16th column
+    """
+
+    def __init__(self, G, seed_mets_input, maxnumpath=1000, n_jobs=1,
+                 targets=None, table_store=None, prune_reversible_pairs=False):
+        self.G = G
+        self.seedmets = seed_mets_input
+        self.maxnumpath = maxnumpath
+        if n_jobs == -1:
+            n_jobs = os.cpu_count() or 1
+        self.n_jobs = n_jobs
+        self.targets = targets
+        self.lower_bound_metabolite = None
+        self.status_dict = None
+        self.excluded_reactions = set()
+        self.scope = None
+        # Pathway table and cyclic pathways with the pathways stored as
+        # reaction masks. See _index_reactions_and_metabolites
+        if table_store is None:
+            table_store = MemoryTableStore()
+        self._pathway_table = table_store
+        self._cyclic_pathways = {}
+        self._reaction_names = []
+        self._reaction_component = {}
+        self._metabolite_bit = {}
+        # Inputs, other than the seed metabolites, and products of the
+        # reactions, see _find_reactions_to_visit
+        self._reaction_inputs = {}
+        self._reaction_products = {}
+        # Lower bits of the pairs of reversible reactions, see
+        # _index_reactions_and_metabolites
+        self.prune_reversible_pairs = prune_reversible_pairs
+        self._reversible_pair_mask = 0
+        # Reactions evaluated for every column, and metabolites for which
+        # the table is filled (None if all the metabolites are evaluated)
+        self._rxns_to_fill = []
+        self._relevant_metabolites = None
+        # Number of pathways in every entry, and cyclic pathways, at the end
+        # of every column. See _record_column
+        self.completed_column = 0
+        self.incomplete_column = None
+        self.checkpoint_file = None
+        self._deadline = None
+        self._memory_limit = None
+        self._metabolite_column = {}
+        self._cell_sizes = {}
+        self._cyclic_history = {}
+        # Size from which the input masks of the pathways are not kept, see
+        # count_pathways
+        self._counted_size = None
+
+    def run(self, path_len_cutoff, time_limit=None, memory_limit=None):
+        """
+        This function fills the pathway table for all pathway lengths up to
+        the cut-off. If the table has already been filled up to a smaller
+        cut-off, the calculations resume from the last completed column.
+
+        Parameters
+        ----------
+        path_len_cutoff : int
+            Maximum size of the pathways
+        time_limit : float
+            Time (in seconds) after which the calculations are stopped.
+            By default, there is no limit
+        memory_limit : float
+            Memory (resident set size of the process, in MB) beyond which the
+            calculations are stopped. By default, there is no limit
+
+        Returns
+        -------
+        completed : bool
+            False if the calculations were stopped by the time or memory
+            limit. The column which was being filled is then stored in
+            incomplete_column, and the tables of the completed columns can
+            still be obtained
+
+        Notes
+        -----
+        The limits are checked between the combinations of pathways
+        evaluated for every reaction, hence the calculations may exceed
+        them by the time taken, or the memory used, by one combination.
+        The pathways found in an incomplete column are removed when the
+        calculations are continued.
+        """
+        if time_limit is not None:
+            self._deadline = time.perf_counter() + time_limit
+        else:
+            self._deadline = None
+        self._memory_limit = memory_limit
+        if self._counted_size is not None and \
+                path_len_cutoff > self._counted_size:
+            print('The pathways have been counted up to the size',
+                  self._counted_size, 'and the table cannot be filled further')
+            path_len_cutoff = self._counted_size
+        if self.incomplete_column is not None:
+            self._remove_incomplete_column()
+        if self.completed_column == 0:
+            self._initialise_table()
+            self._record_column(1)
+            if self.checkpoint_file:
+                self.save_checkpoint(self.checkpoint_file)
+        column_pool = None
+        if self.n_jobs > 1 and self.completed_column < path_len_cutoff:
+            # Processes read the table written so far
+            self._pathway_table.flush()
+            column_pool = _ColumnPool(self, self.n_jobs)
+        try:
+            # For filling values from the second column
+            for currentcolumnidx in range(self.completed_column+1, path_len_cutoff+1):
+                if not self._fill_column(currentcolumnidx, column_pool):
+                    self.incomplete_column = currentcolumnidx
+                    print('Limit reached while finding pathways of length',
+                          currentcolumnidx)
+                    return False
+                self._record_column(currentcolumnidx)
+                if self.checkpoint_file:
+                    self.save_checkpoint(self.checkpoint_file)
+                if column_pool is not None and currentcolumnidx < path_len_cutoff:
+                    column_pool.send_changes(self._pathway_table.changes_of_cells(
+                        self._cells_changed_in(currentcolumnidx)))
+        finally:
+            if column_pool is not None:
+                column_pool.close()
+        return True
+
+    def _limit_reached(self):
+        """
+        Returns True if the time limit or the memory limit has been reached
+        """
+        if self._deadline is not None and time.perf_counter() > self._deadline:
+            return True
+        if self._memory_limit is not None and \
+                _memory_usage() > self._memory_limit:
+            return True
+        return False
+
+    def _remove_incomplete_column(self):
+        """
+        This function removes the pathways found in the column which was
+        being filled when the calculations were stopped, so that the table
+        is the one at the end of the last completed column.
+        """
+        column = self.completed_column
+        cell_sizes = {}
+        for metab, sizes in self._cell_sizes.items():
+            cell_sizes[metab] = {}
+            for pathlen, history in sizes.items():
+                cell_size = self._size_at_column(history, column)
+                if cell_size is not None:
+                    cell_sizes[metab][pathlen] = cell_size
+        self._pathway_table.restore(cell_sizes)
+        cyclic_pathways = {}
+        for metab, cells in self._cyclic_history.items():
+            for pathlen, history in cells.items():
+                rxnmask = self._size_at_column(history, column)
+                if rxnmask is not None:
+                    cyclic_pathways.setdefault(metab, {})[pathlen] = rxnmask
+        self._cyclic_pathways = cyclic_pathways
+        self.incomplete_column = None
+
+    def save_checkpoint(self, checkpoint_file):
+        """
+        This function writes the state of the calculations to a file, from
+        which they can be continued (see load_checkpoint). The graph is not
+        written, but its fingerprint and the fingerprint of the seed
+        metabolites are. The file is replaced only once it has been written
+        completely.
+
+        Parameters
+        ----------
+        checkpoint_file : str
+            Name of the checkpoint file
+
+        Returns
+        -------
+        None
+        """
+        self._pathway_table.flush()
+        state = self.__dict__.copy()
+        del state['G']
+        checkpoint = {'graph_fingerprint': graph_fingerprint(self.G),
+                      'seed_fingerprint': seed_fingerprint(self.seedmets),
+                      'state': state}
+        temporary_file = checkpoint_file + '.tmp'
+        with open(temporary_file, 'wb') as filetowrite:
+            pickle.dump(checkpoint, filetowrite, pickle.HIGHEST_PROTOCOL)
+        os.replace(temporary_file, checkpoint_file)
+
+    @classmethod
+    def load_checkpoint(cls, checkpoint_file, G, seed_mets_input):
+        """
+        This function creates the object from a file written by
+        save_checkpoint, if the graph and the seed metabolites are the ones
+        used when the file was written.
+
+        Parameters
+        ----------
+        checkpoint_file : str
+            Name of the checkpoint file
+        G : NetworkX DiGraph Object or CompiledGraph
+            Bipartite graph of the metabolic network
+        seed_mets_input : set
+            Set of seed metabolites including the source
+
+        Returns
+        -------
+        assembler : PathwayAssembler
+            Object with the columns filled before the checkpoint, or None if
+            the graph or the seed metabolites do not match
+        """
+        with open(checkpoint_file, 'rb') as filetoread:
+            checkpoint = pickle.load(filetoread)
+        if checkpoint['graph_fingerprint'] != graph_fingerprint(G):
+            print('The graph is not the one used for', checkpoint_file)
+            return None
+        if checkpoint['seed_fingerprint'] != seed_fingerprint(seed_mets_input):
+            print('The seed metabolites are not the ones used for', checkpoint_file)
+            return None
+        assembler = cls.__new__(cls)
+        assembler.__dict__.update(checkpoint['state'])
+        assembler.G = G
+        return assembler
+
+    def get_pathway_table(self, path_len_cutoff=None):
+        """
+        Parameters
+        ----------
+        path_len_cutoff : int
+            Size cut-off of the pathways, which must not be greater than the
+            last completed column. By default, the last completed column
+
+        Returns
+        -------
+        pathway_table : dict
+            Dictionary of dictionary containing the pathways of different sizes
+            identified for every metabolite. This will have only the acyclic/
+            branched pathways. This is the same as the table returned by
+            find_pathways with this cut-off.
+        """
+        column = self._column_of_cutoff(path_len_cutoff)
+        converted_table = {}
+        for metab, cells in self._pathway_table.items():
+            if self._metabolite_column.get(metab, column + 1) > column:
+                continue
+            converted_table[metab] = {}
+            for pathlen, cell in cells.items():
+                cell_size = self._size_at_column(
+                    self._cell_sizes[metab].get(pathlen, ()), column)
+                if cell_size is None:
+                    continue
+                if pathlen == 0:
+                    converted_table[metab][pathlen] = ''
+                else:
+                    converted_table[metab][pathlen] = [
+                        self._mask_to_reactions(rxnmask)
+                        for rxnmask in itertools.islice(cell, cell_size)]
+        return converted_table
+
+    def get_cyclic_pathways(self, path_len_cutoff=None):
+        """
+        Parameters
+        ----------
+        path_len_cutoff : int
+            Size cut-off of the pathways, which must not be greater than the
+            last completed column. By default, the last completed column
+
+        Returns
+        -------
+        cyclic_pathways : dict
+            Dictionary of dictionary containing cyclic pathways of different
+            sizes identified for every metabolite.
+        """
+        column = self._column_of_cutoff(path_len_cutoff)
+        converted_table = {}
+        for metab, cells in self._cyclic_history.items():
+            for pathlen, history in cells.items():
+                rxnmask = self._size_at_column(history, column)
+                if rxnmask is not None:
+                    converted_table.setdefault(metab, {})[pathlen] = [
+                        list(self._mask_to_reactions(rxnmask))]
+        return converted_table
+
+    def get_pathway_counts(self, path_len_cutoff=None):
+        """
+        Parameters
+        ----------
+        path_len_cutoff : int
+            Size cut-off of the pathways, which must not be greater than the
+            last completed column. By default, the last completed column
+
+        Returns
+        -------
+        pathway_counts : dict
+            Dictionary of dictionary containing the number of pathways of
+            different sizes in the pathway table, for every metabolite.
+            Seed metabolites have one pathway of size 0
+        """
+        column = self._column_of_cutoff(path_len_cutoff)
+        pathway_counts = {}
+        for metab, cells in self._pathway_table.items():
+            if self._metabolite_column.get(metab, column + 1) > column:
+                continue
+            pathway_counts[metab] = {}
+            for pathlen in cells:
+                cell_size = self._size_at_column(
+                    self._cell_sizes[metab].get(pathlen, ()), column)
+                if cell_size is None:
+                    continue
+                if pathlen == 0:
+                    pathway_counts[metab][pathlen] = 1
+                else:
+                    pathway_counts[metab][pathlen] = cell_size
+        return pathway_counts
+
+    def iter_pathways(self, target, path_len_cutoff):
+        """
+        This function fills the pathway table one column at a time, and
+        generates the pathways producing the target metabolite once the
+        column of their size has been filled. Since a column only adds
+        pathways of its size or larger, the pathways of a size are final
+        once its column has been filled.
+
+        Parameters
+        ----------
+        target : str
+            Target metabolite
+        path_len_cutoff : int
+            Maximum size of the pathways
+
+        Yields
+        ------
+        pathlen : int
+            Size of the pathway
+        pathway : set
+            Set of reactions in the pathway
+        """
+        for currentcolumnidx in range(1, path_len_cutoff+1):
+            if currentcolumnidx > self.completed_column:
+                self.run(currentcolumnidx)
+            cell = self._pathway_table.get(target, {}).get(currentcolumnidx, {})
+            for rxnmask in cell:
+                yield currentcolumnidx, self._mask_to_reactions(rxnmask)
+
+    def find_shortest_pathways(self, target, k, path_len_cutoff=None):
+        """
+        This function fills the pathway table one column at a time, until k
+        pathways producing the target metabolite have been found.
+
+        Parameters
+        ----------
+        target : str
+            Target metabolite
+        k : int
+            Number of pathways to be found
+        path_len_cutoff : int
+            Maximum size of the pathways. By default, the columns are filled
+            until no larger pathway can be found
+
+        Returns
+        -------
+        shortest_pathways : list
+            List of pairs of the size and the set of reactions of the
+            pathways, in increasing order of the sizes
+
+        Notes
+        -----
+        If a single pathway is required and the lower and upper bounds of
+        find_minimum_pathway_sizes are equal for the target, the witness
+        pathway of the bounds is returned without filling the table.
+        """
+        shortest_pathways = []
+        if k <= 0:
+            return shortest_pathways
+        if k == 1 and target not in self.seedmets and \
+                (path_len_cutoff is None or path_len_cutoff >= 1):
+            if self.completed_column == 0:
+                # The reactions to be excluded are found with the first column
+                self.run(1)
+            lower_bound_size, upper_bound_size, witness_pathways = \
+                find_minimum_pathway_sizes(self.G, self.seedmets,
+                                           self.excluded_reactions)
+            if target in lower_bound_size and \
+                    lower_bound_size[target] == upper_bound_size[target] and \
+                    (path_len_cutoff is None or
+                     upper_bound_size[target] <= path_len_cutoff):
+                return [(upper_bound_size[target], witness_pathways[target])]
+        currentcolumnidx = 1
+        while path_len_cutoff is None or currentcolumnidx <= path_len_cutoff:
+            if currentcolumnidx > self.completed_column:
+                self.run(currentcolumnidx)
+            cell = self._pathway_table.get(target, {}).get(currentcolumnidx, {})
+            for rxnmask in cell:
+                shortest_pathways.append(
+                    (currentcolumnidx, self._mask_to_reactions(rxnmask)))
+                if len(shortest_pathways) == k:
+                    return shortest_pathways
+            # Pathways of a size are made from the pathways of the smaller
+            # sizes, hence no pathway can be found once the table has no
+            # pathway of the current size or larger
+            if not any(pathlen >= currentcolumnidx
+                       for sizes in self._cell_sizes.values()
+                       for pathlen, history in sizes.items() if history[-1][1]):
+                break
+            currentcolumnidx += 1
+        return shortest_pathways
+
+    def count_pathways(self, path_len_cutoff):
+        """
+        This function fills the pathway table up to the cut-off and counts
+        the pathways of every size, keeping only what the columns up to the
+        cut-off combine.
+
+        Parameters
+        ----------
+        path_len_cutoff : int
+            Maximum size of the pathways
+
+        Returns
+        -------
+        pathway_counts : dict
+            Dictionary of dictionary containing the number of pathways of
+            different sizes, as returned by get_pathway_counts
+
+        Notes
+        -----
+        A column combines the pathways smaller than its pathway length,
+        hence the input masks of the pathways of the size of the cut-off or
+        larger are never used. These pathways are stored with an input mask
+        of 0, so that only their reaction masks are kept to find the
+        distinct ones. The table cannot be filled beyond the cut-off
+        afterwards, and the input masks of these pathways are not valid.
+        If the table has already been filled, it is only filled up to the
+        cut-off.
+        """
+        if self.completed_column == 0 and self.incomplete_column is None:
+            self._counted_size = path_len_cutoff
+        self.run(path_len_cutoff)
+        return self.get_pathway_counts(path_len_cutoff)
+
+    def count_partition_combinations(self, path_len_cutoff):
+        """
+        This function counts, for every metabolite and size, the number of
+        ways of combining the reactions which produce the metabolite,
+        without filling the pathway table. These are not numbers of
+        pathways, see count_partition_combinations.
+
+        Parameters
+        ----------
+        path_len_cutoff : int
+            Maximum size of the pathways
+
+        Returns
+        -------
+        combination_counts : dict
+            Dictionary of dictionary containing the number of combinations
+            of different sizes for every metabolite. Seed metabolites have
+            one combination of size 0
+        """
+        seedmets = self.seedmets
+        rxns_to_visit = self._find_reactions_to_visit()
+        pathway_counts = {}
+        for seedmetabs in seedmets:
+            pathway_counts[seedmetabs] = {0: 1}
+        rxn_inputs = self._reaction_inputs
+        for currentcolumnidx in range(1, path_len_cutoff+1):
+            new_counts = {}
+            for rxns in rxns_to_visit:
+                mets_needed = rxn_inputs[rxns]
+                if not mets_needed:
+                    number_of_combinations = 1 if currentcolumnidx == 1 else 0
+                else:
+                    # Number of combinations of the pathways of the inputs,
+                    # whose sizes add up to currentcolumnidx - 1. Sizes of
+                    # the inputs are always smaller than currentcolumnidx
+                    sum_counts = {0: 1}
+                    for metab in mets_needed:
+                        metab_counts = pathway_counts.get(metab, {})
+                        next_sum_counts = {}
+                        for size_so_far, count_so_far in sum_counts.items():
+                            for pathlen, count in metab_counts.items():
+                                if size_so_far + pathlen < currentcolumnidx:
+                                    next_sum_counts[size_so_far + pathlen] = \
+                                        next_sum_counts.get(size_so_far + pathlen, 0) + \
+                                        count_so_far * count
+                        sum_counts = next_sum_counts
+                    number_of_combinations = sum_counts.get(currentcolumnidx-1, 0)
+                if number_of_combinations:
+                    for succmets in self._products(rxns):
+                        # Reactions which require the metabolite they produce
+                        # give only cyclic pathways
+                        if succmets not in mets_needed:
+                            new_counts[succmets] = new_counts.get(succmets, 0) + \
+                                number_of_combinations
+            for metab, count in new_counts.items():
+                pathway_counts.setdefault(metab, {})[currentcolumnidx] = count
+        return pathway_counts
+
+    def _column_of_cutoff(self, path_len_cutoff):
+        """
+        Returns the column up to which the tables are to be returned
+        """
+        if path_len_cutoff is None:
+            return self.completed_column
+        if path_len_cutoff > self.completed_column:
+            print('The pathway table has been filled only up to the size',
+                  self.completed_column)
+            return self.completed_column
+        return path_len_cutoff
+
+    def _record_column(self, currentcolumnidx):
+        """
+        This function records the number of pathways in every entry of the
+        pathway table and the cyclic pathways, once a column has been filled.
+        Since a column only adds pathways to the entries, the first pathways
+        of an entry are the pathways that were found up to any previous
+        column, hence the tables of smaller cut-offs can be recovered.
+
+        Parameters
+        ----------
+        currentcolumnidx : int
+            An integer denoting the column which has been filled
+
+        Returns
+        -------
+        None
+        """
+        self._pathway_table.flush()
+        for metab, pathlen, cell_size in self._pathway_table.cell_lengths():
+            if metab not in self._metabolite_column:
+                self._metabolite_column[metab] = currentcolumnidx
+                self._cell_sizes[metab] = {}
+            cell_sizes = self._cell_sizes[metab]
+            if pathlen not in cell_sizes:
+                cell_sizes[pathlen] = [(currentcolumnidx, cell_size)]
+            elif cell_sizes[pathlen][-1][1] != cell_size:
+                cell_sizes[pathlen].append((currentcolumnidx, cell_size))
+        # Cyclic pathways of an entry are overwritten, hence the pathway
+        # at the end of every column is recorded
+        for metab, cells in self._cyclic_pathways.items():
+            cyclic_history = self._cyclic_history.setdefault(metab, {})
+            for pathlen, rxnmask in cells.items():
+                if pathlen not in cyclic_history:
+                    cyclic_history[pathlen] = [(currentcolumnidx, rxnmask)]
+                elif cyclic_history[pathlen][-1][1] != rxnmask:
+                    cyclic_history[pathlen].append((currentcolumnidx, rxnmask))
+        self.completed_column = currentcolumnidx
+
+    def _cells_changed_in(self, column):
+        """
+        Returns the list of the metabolite, the pathway length and the
+        number of pathways before the column, of the entries of the table
+        to which the given column added pathways
+        """
+        changed_cells = []
+        for metab, sizes in self._cell_sizes.items():
+            for pathlen, history in sizes.items():
+                if history[-1][0] == column:
+                    previous_size = history[-2][1] if len(history) > 1 else 0
+                    changed_cells.append((metab, pathlen, previous_size))
+        return changed_cells
+
+    @staticmethod
+    def _size_at_column(history, column):
+        """
+        Returns the last value recorded up to the given column, or None if
+        no value had been recorded
+        """
+        value = None
+        for recorded_column, recorded_value in history:
+            if recorded_column > column:
+                break
+            value = recorded_value
+        return value
+
+    def _initialise_table(self):
+        """
+        This function fills the first column of the pathway table, with the
+        reactions which require only seed metabolites.
+        """
+        pred = self.G.predecessors
+        seedmets = self.seedmets
+        rxns_to_visit = self._find_reactions_to_visit()
+        self._index_reactions_and_metabolites(rxns_to_visit)
+        pathway_table = self._pathway_table
+        # For seed metabolites, the pathway table is initialised to 0
+        for seedmetabs in list(seedmets):
+            pathway_table[seedmetabs] = {0: {}}
+        # Status dict consists of all the reactions that can be
+        # visited from the seed metabolites
+        for rxns in rxns_to_visit:
+            if set(pred(rxns)).issubset(seedmets):
+                # Initialisation of dictionary with the
+                # metabolites produced with one rxn
+                # Since we don't want pathways generating seed metabolites,
+                # only the products of the reaction are considered
+                products = self._products(rxns)
+                for metssucc in products:
+                    if metssucc not in pathway_table:
+                        pathway_table[metssucc] = {1: {}}
+                # Filling table with one reaction that produced metabolite
+                rxnmask, inputmask = self._reaction_component[rxns]
+                for metssucc in products:
+                    pathway_table[metssucc][1][rxnmask] = inputmask
+
+    def _find_reactions_to_visit(self):
+        """
+        This function excludes the reactions with many inputs, performs the
+        forward pass and, if targets are given, the backward pass.
+
+        Returns
+        -------
+        rxns_to_visit : list
+            Sorted list of the reactions which are evaluated
+        """
+        G = self.G
+        seedmets = self.seedmets
+        pred = G.predecessors
+        # Removing reactions whose reactants are more than 5
+        if isinstance(G, CompiledGraph):
+            reaction_nodes = G.reactions()
+        else:
+            node_attributes = get_node_attributes(G, 'bipartite')
+            node_attributes_inverted_dict = {}
+            # 0 metabolites , 1 are reactions
+            for keys, values in node_attributes.items():
+                node_attributes_inverted_dict[values] = \
+                    node_attributes_inverted_dict.get(values, [])
+                node_attributes_inverted_dict[values].append(keys)
+            reaction_nodes = node_attributes_inverted_dict[1]
+        # If the number of metabolites, apart from the ones provided
+        # in seed are greater than 5, such reactions are excluded. The
+        # graph is not modified, the forward pass skips these reactions
+        # and hence they are never evaluated
+        self.excluded_reactions = set(
+            rxnstoremove for rxnstoremove in reaction_nodes
+            if len(set(pred(rxnstoremove)) - seedmets) >= 5)
+        # Performing guided BFS on directed graph by calling forward_pass
+        self.lower_bound_metabolite, self.status_dict, self.scope = \
+            forward_pass(G, seedmets, self.excluded_reactions)
+        # Sorting the keys (reactions) in the status dictionary,
+        # since dictionary keys are not good to iterate over.
+        # There could be differences in the order of insertion of
+        # dictionary keys. Although, this does not matter with the
+        # algorithm implementation.
+        rxns_to_visit = list(self.status_dict.keys())
+        rxns_to_visit.sort()
+        self._rxns_to_fill = list(self.status_dict)
+        if self.targets is not None:
+            relevant_reactions, self._relevant_metabolites = backward_pass(
+                G, self.targets, self.status_dict, seedmets)
+            rxns_to_visit = [rxns for rxns in rxns_to_visit
+                             if rxns in relevant_reactions]
+            self._rxns_to_fill = [rxns for rxns in self._rxns_to_fill
+                                  if rxns in relevant_reactions]
+        # The inputs and the products of the reactions are required for
+        # every column, hence they are listed once instead of being looked
+        # up in the graph for every column
+        relevant_metabolites = self._relevant_metabolites
+        self._reaction_inputs = {}
+        self._reaction_products = {}
+        for rxns in rxns_to_visit:
+            self._reaction_inputs[rxns] = list(set(pred(rxns)) - seedmets)
+            self._reaction_products[rxns] = [
+                succmets for succmets in G.successors(rxns)
+                if succmets not in seedmets and
+                (relevant_metabolites is None or succmets in relevant_metabolites)]
+        return rxns_to_visit
+
+    def _fill_column(self, currentcolumnidx, column_pool=None):
+        """
+        This function fills the column of the pathway table corresponding to
+        the given pathway length.
+
+        Parameters
+        ----------
+        currentcolumnidx : int
+            An integer denoting the current column which is evaluated
+        column_pool : _ColumnPool
+            Processes finding the pathways of the reactions, if n_jobs is
+            greater than 1
+
+        Returns
+        -------
+        completed : bool
+            False if the time or memory limit was reached before the column
+            was filled
+        """
+        if column_pool is not None:
+            return self._fill_column_parallel(currentcolumnidx, column_pool)
+        for rxns in self._rxns_to_fill:
+            for exceeds, temp_rxn_list_current in \
+                    self._reaction_combinations(rxns, currentcolumnidx):
+                if self._limit_reached():
+                    return False
+                if exceeds and self._products_found(rxns):
+                    continue
+                self._populate_table(rxns, self._unite_pathways(
+                    temp_rxn_list_current, currentcolumnidx))
+        return True
+
+    def _fill_column_parallel(self, currentcolumnidx, column_pool):
+        """
+        This function fills the column of the pathway table corresponding to
+        the given pathway length, with the pathways that the processes find
+        for every reaction from the columns filled before. These pathways
+        are added to the table in the order of the reactions, as soon as
+        the ones of the previous reactions have been added.
+
+        Parameters
+        ----------
+        currentcolumnidx : int
+            An integer denoting the current column which is evaluated
+        column_pool : _ColumnPool
+            Processes finding the pathways of the reactions
+
+        Returns
+        -------
+        completed : bool
+            False if the time or memory limit was reached before the column
+            was filled
+        """
+        cyclic_pathways = self._cyclic_pathways
+        for rxns, rxn_pathways in column_pool.find_pathways(
+                self._rxns_to_fill, currentcolumnidx):
+            for exceeds, pathways, last_cyclic_pathways in rxn_pathways:
+                if self._limit_reached():
+                    return False
+                # The pathways of the previous reactions may have
+                # produced all the products of this reaction
+                if exceeds and self._products_found(rxns):
+                    continue
+                self._populate_table(rxns, pathways)
+                for (succmets, pathlen), rxnmask in last_cyclic_pathways.items():
+                    cyclic_pathways.setdefault(succmets, {})[pathlen] = rxnmask
+        return True
+
+    def _find_new_pathways_of_reaction(self, rxns, currentcolumnidx):
+        """
+        This function finds the pathways of the given length produced by a
+        reaction, which can change the pathway table, without adding them
+        to the table.
+
+        Parameters
+        ----------
+        rxns : str
+            Current reaction which is evaluated
+        currentcolumnidx : int
+            An integer denoting the current column which is evaluated
+
+        Returns
+        -------
+        rxn_pathways : list
+            List of triples for every combination of pathways: a flag, which
+            is True if the number of pathways exceeds maxnumpath, the list of
+            pathways, as tuples of the reaction mask, the input mask and the
+            length of the pathway, and a dictionary mapping the products and
+            the lengths of the cyclic pathways to the last cyclic pathway
+
+        Notes
+        -----
+        The first pathway of a combination is always kept, since it adds the
+        products of the reaction to the table if they are not in it. The
+        other pathways are kept only the first time they are found, if they
+        are not cyclic and not already in the entry of one of the products.
+        The last cyclic pathway of every product and length, leaving out the
+        first pathway, replaces the cyclic pathways set by the pathways
+        kept, hence the table and the cyclic pathways are the ones which
+        all the pathways would give.
+        """
+        rxn_pathways = []
+        products = self._products(rxns)
+        if not products:
+            return rxn_pathways
+        pathway_table = self._pathway_table
+        metabolite_bit = self._metabolite_bit
+        product_bits = [(succmets, metabolite_bit.get(succmets, 0))
+                        for succmets in products]
+        for exceeds, temp_rxn_list_current in \
+                self._reaction_combinations(rxns, currentcolumnidx):
+            if exceeds and self._products_found(rxns):
+                continue
+            pathways = []
+            last_cyclic_pathways = {}
+            found = set()
+            for pathway in self._unite_pathways(temp_rxn_list_current,
+                                                currentcolumnidx):
+                rxnmask, inputmask, pathlen = pathway
+                if not pathways:
+                    pathways.append(pathway)
+                    found.add(rxnmask)
+                    continue
+                new_pathway = False
+                for succmets, metabbit in product_bits:
+                    if inputmask & metabbit:
+                        last_cyclic_pathways[succmets, pathlen] = rxnmask
+                    elif rxnmask not in found and (
+                            succmets not in pathway_table or rxnmask not in
+                            pathway_table[succmets].get(pathlen, ())):
+                        new_pathway = True
+                if new_pathway:
+                    pathways.append(pathway)
+                    found.add(rxnmask)
+            rxn_pathways.append((exceeds, pathways, last_cyclic_pathways))
+        return rxn_pathways
+
+    def _products(self, rxns):
+        """
+        Returns the products of the reaction for which the pathway table is
+        filled, i.e., the products which are not seed metabolites and, if
+        targets are given, take part in producing the targets
+        """
+        return self._reaction_products[rxns]
+
+    def _products_found(self, rxns):
+        """
+        Returns True if all the products of the reaction are in the
+        pathway table
+        """
+        pathway_table = self._pathway_table
+        return all(metab in pathway_table for metab in self._products(rxns))
+
+    def _reaction_combinations(self, rxns, currentcolumnidx):
+        """
+        This function generates the combinations of the cells of the pathway
+        table, which would give pathways of the current length when combined
+        with the given reaction.
+
+        Parameters
+        ----------
+        rxns : str
+            Current reaction which is evaluated
+        currentcolumnidx : int
+            An integer denoting the current column which is evaluated
+
+        Yields
+        ------
+        exceeds : bool
+            True if the number of pathways of the combination exceeds
+            maxnumpath
+        temp_rxn_list_current : list
+            a list of lists consisting of all the alternate pathways
+            producing the metabolites required by the reaction
+        """
+        # To eliminate seed metabolites, whose column value
+        # is always 0 - so that more partitions are not generated.
+        mets_needed = self._reaction_inputs[rxns]
+        # To only go over reactions whose inputs are not
+        # seed metabolites. There could be reactions whose inputs
+        # are only seed mets, eg atp + h2o
+        if mets_needed:
+            for val in range(currentcolumnidx-1,
+                             len(mets_needed)*(currentcolumnidx-1)+1):
+                if val <= len(mets_needed)*(currentcolumnidx-2):
+                    yield from self._first_round_calculations(
+                        mets_needed, currentcolumnidx, rxns, val)
+                else:
+                    yield from self._second_round_calculations(
+                        mets_needed, currentcolumnidx, rxns, val)
+
+    def _index_reactions_and_metabolites(self, rxns_to_visit):
+        """
+        This function assigns a bit to every reaction that can be visited and
+        to every metabolite, other than the seed metabolites, that is required
+        by these reactions. A pathway is stored as an integer whose bits are
+        set for the reactions in the pathway (reaction mask), along with an
+        integer whose bits are set for the metabolites required by the
+        reactions in the pathway (input mask). The union of two pathways is
+        then the bitwise OR of their masks, and a pathway is cyclic if the bit
+        of the metabolite it produces is set in its input mask.
+
+        If prune_reversible_pairs is set, the second direction of a reversible
+        reaction is given the bit next to the first one, so that a pathway
+        holds both directions if mask & (mask >> 1) has a bit of the lower
+        reactions of the pairs set.
+
+        Parameters
+        ----------
+        rxns_to_visit : list
+            List of reactions visited by the forward pass
+
+        Returns
+        -------
+        None
+        """
+        pred = self.G.predecessors
+        self._reaction_names = list(rxns_to_visit)
+        self._reversible_pair_mask = 0
+        if self.prune_reversible_pairs:
+            self._pair_reversible_reactions()
+        self._reaction_component = {}
+        self._metabolite_bit = {}
+        for rxnidx, rxns in enumerate(self._reaction_names):
+            inputmask = 0
+            for inputmetab in pred(rxns):
+                if inputmetab not in self.seedmets:
+                    if inputmetab not in self._metabolite_bit:
+                        self._metabolite_bit[inputmetab] = \
+                            1 << len(self._metabolite_bit)
+                    inputmask |= self._metabolite_bit[inputmetab]
+            self._reaction_component[rxns] = (1 << rxnidx, inputmask)
+
+    def _pair_reversible_reactions(self):
+        """
+        This function places the two directions of every reversible reaction
+        next to each other in the list of reactions, and sets the bit of the
+        first one in the mask of the pairs.
+        """
+        reaction_set = set(self._reaction_names)
+        reaction_names = []
+        placed = set()
+        for rxns in self._reaction_names:
+            if rxns in placed:
+                continue
+            reaction_names.append(rxns)
+            placed.add(rxns)
+            twin = _reversible_twin(rxns)
+            if twin in reaction_set and twin not in placed:
+                self._reversible_pair_mask |= 1 << (len(reaction_names) - 1)
+                reaction_names.append(twin)
+                placed.add(twin)
+        self._reaction_names = reaction_names
+
+    def _mask_to_reactions(self, rxnmask):
+        """
+        This function returns the set of reactions whose bits are set in a
+        reaction mask.
+
+        Parameters
+        ----------
+        rxnmask : int
+            Reaction mask of a pathway
+
+        Returns
+        -------
+        reactions : set
+            Set of reactions in the pathway
+        """
+        reaction_names = self._reaction_names
+        reactions = set()
+        while rxnmask:
+            lowest_bit = rxnmask & -rxnmask
+            reactions.add(reaction_names[lowest_bit.bit_length() - 1])
+            rxnmask ^= lowest_bit
+        return reactions
+
+    def _first_round_calculations(self, mets_needed, currentcolumnidx, rxns, val):
+        """
+        This function takes as input metabolites required by the reaction,
+        current column index (pathway length) which we are trying to fill,
+        the current reaction which we are considering and the sum that we
+        need to generate. This function tries to calculate the upper limit
+        on the number of inputs that can take the value of (k-1) and generate
+        partitions which have not been previously generated. For more
+        details, please refer main manuscript (Algorithm 1 - Lines 14-19)
+
+        Parameters
+        ----------
+        mets_needed : list
+            List of metabolites a reaction requires
+        currentcolumnidx : int
+            An integer denoting the current column which is evaluated
+        rxns : str
+            Current reaction which is evaluated
+        val : int
+            Maximum sum that is to be generated
+
+        Yields
+        ------
+        exceeds : bool
+            True if the number of pathways of the combination exceeds
+            maxnumpath
+        temp_rxn_list_current : list
+            Pathways producing the metabolites required by the reaction
+        """
+        pathway_table = self._pathway_table
+        # Line 15 in the algorithm - Upper limit on the number of
+        # inputs that can take the value of (k-1)
+        optimized_val = int(math.floor(val/((currentcolumnidx-1))))
+        for currentval in range(1, optimized_val+1):
+            # GENERATING COMBINATIONS
+            # This will give combinations of  metabolites whose size is
+            # defined by currentval
+            for currentmetcomb in itertools.combinations(mets_needed, currentval):
+                temp_rxn_list = []
+                number_of_pathways_found = {}
+                onemetnotfound = ''
+                for metabolites in list(currentmetcomb):
+                    if metabolites in pathway_table:
+                        # To ensure that the current iteration uses metabs
+                        # generated only till the previous iteration
+                        if currentcolumnidx - 1 in pathway_table[metabolites]:
+                            temp_rxn_list.append([self._reaction_component[rxns]])
+                            number_of_pathways_found[metabolites] = \
+                                len(pathway_table[metabolites][currentcolumnidx-1])
+                        else:
+                            # Because one of the metabolites is not found,
+                            # hence breaks out of the second loop
+                            onemetnotfound = 'Y'
+                            break
+                if onemetnotfound != 'Y':
+                    other_mets_not_in_comb = list(set(mets_needed) - set(currentmetcomb))
+                    if set(currentmetcomb).issubset(pathway_table):
+                        for mets in currentmetcomb:
+                            # Assigning the value of columnindex -1
+                            # to the metabolites in current metabolite combination
+                            temp_rxn_list.append(
+                                pathway_table[mets][currentcolumnidx-1].items())
+
+                        first_discovery_step = []
+                        # This will give values of the lower bound of
+                        # metabolites which are not involved in combination
+                        for varmet in list(other_mets_not_in_comb):
+                            first_discovery_step.append(
+                                min(self.lower_bound_metabolite[varmet]))
+                        all_partitions = generate_partitions(
+                            val-((currentcolumnidx-1)*currentval),
+                            first_discovery_step, currentcolumnidx - 1)
+                        for partitions in all_partitions:
+                            yield from self._find_all_rxn_combination_firstround(
+                                partitions, other_mets_not_in_comb,
+                                temp_rxn_list, number_of_pathways_found)
+
+    def _find_all_rxn_combination_firstround(self, partitions,
+                                             other_mets_not_in_comb,
+                                             temp_rxn_list,
+                                             number_of_pathways_found):
+        """
+        This function fetches the pathways from the table corresponding to
+        the entries in partition generated.
+
+        Parameters
+        ----------
+        paritions : tuple
+            Combinations of numbers that would geenrate the required sum
+        other_mets_not_in_comb : list
+            other metabolites participating in the reaction for which a
+            number from the partition has not been assigned yet
+        temp_rxn_list : list
+            a list consisting of all pathways that generated the metabolite
+            for which the value of (k-1) is assigned
+        number_of_pathways_found : dict
+            number of pathways found for the metabolite evaluated
+
+        Yields
+        ------
+        exceeds : bool
+            True if the number of pathways of the combination exceeds
+            maxnumpath
+        temp_rxn_list_current : list
+            Pathways producing the metabolites required by the reaction
+        """
+        pathway_table = self._pathway_table
+        # To check if all the other metabolites required by that reaction
+        # can be generated using the partitions.
+        counter = 0
+        for varmetidx in range(len(other_mets_not_in_comb)):
+            if other_mets_not_in_comb[varmetidx] in pathway_table:
+                # checking if the pathway table consists of values from the
+                # current partition for the input metabolite
+                if partitions[varmetidx] in pathway_table[other_mets_not_in_comb[varmetidx]]:
+                    counter += 1
+                    number_of_pathways_found[other_mets_not_in_comb[varmetidx]] = \
+                        len(pathway_table[other_mets_not_in_comb[varmetidx]][partitions[varmetidx]])
+        if counter == len(other_mets_not_in_comb):
+            # Deep copy of the reaction list, because temp_rxn_list_current
+            # varies with every iteration to evaluate other partitions
+            temp_rxn_list_current = temp_rxn_list[:]
+            for varmetidx in range(len(other_mets_not_in_comb)):
+                temp_rxn_list_current.append(
+                    pathway_table[other_mets_not_in_comb[varmetidx]]
+                    [partitions[varmetidx]].items())
+            yield (prod(list(number_of_pathways_found.values())) > self.maxnumpath,
+                   temp_rxn_list_current)
+
+    def _unite_pathways(self, temp_rxn_list_current, currentcolumnidx):
+        """
+        This function combines the alternate pathways producing the
+        metabolites required by a reaction.
+
+        Parameters
+        ----------
+        temp_rxn_list_current : list of lists
+            a list of lists consisting of all the alternate pathways
+            producing the metabolites required by the reaction, as pairs of
+            reaction and input masks
+        currentcolumnidx : int
+             value of the current column index (pathway length)
+
+        Yields
+        ------
+        rxnmask : int
+            Reaction mask of the pathway
+        inputmask : int
+            Input mask of the pathway
+        pathlen : int
+            Number of reactions in the pathway, which is at least the
+            current column index
+        """
+        if self._reversible_pair_mask:
+            for rxnmask, inputmask in self._unite_without_reversible_pairs(
+                    temp_rxn_list_current, 0, 0, 0):
+                pathlen = bin(rxnmask).count('1')
+                if pathlen >= currentcolumnidx:
+                    yield rxnmask, inputmask, pathlen
+            return
+        #  Temprxnlist consists of all combinations of pathways
+        #  producing all the input metabolites
+        for rxnunion in itertools.product(*temp_rxn_list_current):
+            rxnmask = 0
+            inputmask = 0
+            for pathwaymask, pathwayinputs in rxnunion:
+                rxnmask |= pathwaymask
+                inputmask |= pathwayinputs
+            pathlen = bin(rxnmask).count('1')
+            if pathlen >= currentcolumnidx:
+                yield rxnmask, inputmask, pathlen
+
+    def _unite_without_reversible_pairs(self, temp_rxn_list_current, position,
+                                        rxnmask, inputmask):
+        """
+        This function combines the alternate pathways of the inputs from the
+        given position onwards with a partial union, in the order of
+        itertools.product, leaving out the combinations which hold both
+        directions of a reversible reaction.
+
+        Yields
+        ------
+        rxnmask : int
+            Reaction mask of the pathway
+        inputmask : int
+            Input mask of the pathway
+        """
+        if position == len(temp_rxn_list_current):
+            yield rxnmask, inputmask
+            return
+        pair_mask = self._reversible_pair_mask
+        for pathwaymask, pathwayinputs in temp_rxn_list_current[position]:
+            unitedmask = rxnmask | pathwaymask
+            if unitedmask & (unitedmask >> 1) & pair_mask:
+                continue
+            yield from self._unite_without_reversible_pairs(
+                temp_rxn_list_current, position + 1, unitedmask,
+                inputmask | pathwayinputs)
+
+    def _populate_table(self, rxns, pathways):
+        """
+        This function fills in the entry in the main pathway table. It also
+        evaluates the pathways and identifies if its cyclic. If the
+        pathway is a cyclic pathway, it is stored separately, and is not
+        used in the subsequent calculations.
+
+        Parameters
+        ----------
+        rxns : str
+            Current reaction which is evaluated
+        pathways : iterable
+            Pathways produced by the reaction, as tuples of the reaction mask,
+            the input mask and the length of the pathway
+
+        Returns
+        -------
+        None
+
+        Notes
+        -----
+        Every entry (metabolite, pathway length) of the pathway table is a
+        dictionary mapping the reaction mask of a pathway to its input mask,
+        so that duplicate pathways are found in constant time while the
+        order in which the pathways are found is kept.
+        """
+        pathway_table = self._pathway_table
+        cyclic_pathways = self._cyclic_pathways
+        metabolite_bit = self._metabolite_bit
+        products = self._products(rxns)
+        if not products:
+            return
+        counted_size = self._counted_size
+        if counted_size is None:
+            counted_size = math.inf
+        for rxnmask, inputmask, pathlen in pathways:
+            # Only the cyclic check needs the input mask of the pathways
+            # which are counted, see count_pathways
+            storedmask = inputmask if pathlen < counted_size else 0
+            for succmets in products:
+                if succmets in pathway_table:
+                    if inputmask & metabolite_bit.get(succmets, 0):
+                        if succmets in cyclic_pathways:
+                            cyclic_pathways[succmets][pathlen] = rxnmask
+                        else:
+                            cyclic_pathways[succmets] = {pathlen: rxnmask}
+                    elif pathlen in pathway_table[succmets]:
+                        # Because this entry may already be in the pathway_table
+                        if rxnmask not in pathway_table[succmets][pathlen]:
+                            pathway_table[succmets][pathlen][rxnmask] = storedmask
+                    else:
+                        pathway_table[succmets][pathlen] = {rxnmask: storedmask}
+                else:
+                    pathway_table[succmets] = {pathlen: {rxnmask: storedmask}}
+
+    def _second_round_calculations(self, mets_needed, currentcolumnidx, rxns, val):
+        """
+        This function takes into account all the metabolites required by the
+        reaction and based on the partition of numbers, fetches the values
+        from the pathway table. Since there can be multiple alternate
+        routes to produce the same metabolite, this function makes a list
+        of all possible pathways (of the given size) that produces this
+        metabolite of interest.
+
+        Parameters
+        ----------
+        mets_needed : list
+            List of metabolites a reaction requires
+        currentcolumnidx : int
+            An integer denoting the current column which is evaluated
+        rxns : str
+            Current reaction which is evaluated
+        val : int
+            Maximum sum that is to be generated
+
+        Yields
+        ------
+        exceeds : bool
+            True if the number of pathways of the combination exceeds
+            maxnumpath
+        temp_rxn_list : list
+            Pathways producing the metabolites required by the reaction
+        """
+        pathway_table = self._pathway_table
+        first_discovery_step = []
+        for predmets in mets_needed:
+            first_discovery_step.append(min(self.lower_bound_metabolite[predmets]))
+        all_partitions = generate_partitions(val, first_discovery_step,
+                                             currentcolumnidx-1)
+        for partitions in all_partitions:
+            temp_rxn_list = []
+            number_of_pathways_found = {}
+            counter_new = 0
+            temp_rxn_list.append([self._reaction_component[rxns]])
+            for item in range(len(mets_needed)):
+                if mets_needed[item] in pathway_table:
+                    if partitions[item] in pathway_table[mets_needed[item]]:
+                        number_of_pathways_found[mets_needed[item]] = \
+                            len(pathway_table[mets_needed[item]][partitions[item]])
+                        counter_new += 1
+            if counter_new == len(mets_needed):
                 for item in range(len(mets_needed)):
-                    temp_rxn_list.append(pathway_table[mets_needed[item]][partitions[item]])
-                _populate_table(rxns, temp_rxn_list, currentcolumnidx)
+                    temp_rxn_list.append(
+                        pathway_table[mets_needed[item]][partitions[item]].items())
+                yield (prod(list(number_of_pathways_found.values())) > self.maxnumpath,
+                       temp_rxn_list)
+
+
+def _reversible_twin(rxn):
+    """
+    Returns the name of the reaction in the other direction of a reversible
+    or exchange reaction, e.g. 'Org_A RevBR12' for 'Org_A RR12', or None
+    """
+    prefix, _, rxnname = rxn.rpartition(' ')
+    rxntype = rxnname.rstrip('0123456789')
+    number = rxnname[len(rxntype):]
+    if not prefix or not number or rxntype not in _REVERSIBLE_TWIN_TYPES:
+        return None
+    return prefix + ' ' + _REVERSIBLE_TWIN_TYPES[rxntype] + number
+
+
+def _memory_usage():
+    """
+    Returns the resident set size of the process, in MB. Where /proc is not
+    available, the peak resident set size is returned.
+    """
+    try:
+        with open('/proc/self/statm') as statmfile:
+            resident_pages = int(statmfile.read().split()[1])
+        return resident_pages * os.sysconf('SC_PAGE_SIZE') / (1024 * 1024)
+    except (OSError, ValueError, IndexError):
+        import resource
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        # Kilobytes on Linux, bytes on macOS
+        if sys.platform == 'darwin':
+            return peak / (1024 * 1024)
+        return peak / 1024
+
+
+class _ColumnPool(object):
+    """
+    Processes finding the pathways of the reactions for the columns of the
+    pathway table of a PathwayAssembler. Every process gets a copy of the
+    assembler when it is started, and the changes of the table after every
+    column (see send_changes).
+    """
+
+    def __init__(self, assembler, n_jobs):
+        context = multiprocessing.get_context()
+        self._connections = []
+        self._processes = []
+        # Connections of the processes which are finding the pathways of a
+        # chunk of reactions
+        self._busy = set()
+        for _ in range(n_jobs):
+            connection, process_connection = context.Pipe()
+            process = context.Process(target=_find_pathways_in_process,
+                                      args=(process_connection, assembler),
+                                      daemon=True)
+            process.start()
+            process_connection.close()
+            self._connections.append(connection)
+            self._processes.append(process)
+
+    def send_changes(self, changes):
+        """
+        Sends the changes of the table (see changes_of_cells of the table
+        stores) to all the processes. They are pickled once.
+        """
+        message = pickle.dumps(('changes', changes), pickle.HIGHEST_PROTOCOL)
+        for connection in self._connections:
+            connection.send_bytes(message)
+
+    def find_pathways(self, rxns_to_visit, currentcolumnidx):
+        """
+        This function splits the reactions in chunks, which are given to the
+        processes as they become free.
+
+        Yields
+        ------
+        rxns : str
+            Reaction, in the order of rxns_to_visit
+        rxn_pathways : list
+            Pathways of the reaction, see
+            PathwayAssembler._find_new_pathways_of_reaction
+        """
+        chunksize = max(1, len(rxns_to_visit) // (len(self._connections) * 4))
+        chunk_starts = iter(range(0, len(rxns_to_visit), chunksize))
+
+        def give_chunk(connection):
+            chunk_start = next(chunk_starts, None)
+            if chunk_start is None:
+                self._busy.discard(connection)
+                return
+            connection.send(('chunk', chunk_start,
+                             rxns_to_visit[chunk_start:chunk_start + chunksize],
+                             currentcolumnidx))
+            self._busy.add(connection)
+
+        for connection in self._connections:
+            give_chunk(connection)
+        # Pathways of the reactions received before the ones of the
+        # previous reactions
+        received = {}
+        for rxnidx, rxns in enumerate(rxns_to_visit):
+            while rxnidx not in received:
+                for connection in wait(list(self._busy)):
+                    message = connection.recv()
+                    if message is None:
+                        give_chunk(connection)
+                    else:
+                        first_rxnidx, chunk_pathways = message
+                        for rxnidx_received, rxn_pathways in enumerate(
+                                chunk_pathways, first_rxnidx):
+                            received[rxnidx_received] = rxn_pathways
+            yield rxns, received.pop(rxnidx)
+        while self._busy:
+            for connection in wait(list(self._busy)):
+                connection.recv()
+                give_chunk(connection)
+
+    def close(self):
+        """
+        Stops the processes. The processes which are still finding pathways,
+        when the time or memory limit was reached, are terminated.
+        """
+        for connection, process in zip(self._connections, self._processes):
+            if connection in self._busy:
+                process.terminate()
+            else:
+                connection.send(None)
+        for connection, process in zip(self._connections, self._processes):
+            process.join()
+            connection.close()
+        self._busy = set()
+
+
+# Number of pathways after which the pathways found for the reactions of a
+# chunk are sent, so that they are merged while the chunk is evaluated
+_SENT_PATHWAYS = 1000
+
+
+def _find_pathways_in_process(connection, assembler):
+    """
+    This function runs in a process of _ColumnPool. It applies the changes
+    of the table to its copy of the assembler, and sends the index of the
+    first reaction and the pathways of consecutive reactions of the chunks
+    it is given, followed by None once a chunk is done.
+    """
+    while True:
+        message = connection.recv()
+        if message is None:
+            break
+        if message[0] == 'changes':
+            assembler._pathway_table.apply_changes(message[1])
+            continue
+        _, chunk_start, rxn_chunk, currentcolumnidx = message
+        first_rxnidx = chunk_start
+        chunk_pathways = []
+        number_of_pathways = 0
+        for rxnidx, rxns in enumerate(rxn_chunk, chunk_start):
+            rxn_pathways = assembler._find_new_pathways_of_reaction(
+                rxns, currentcolumnidx)
+            chunk_pathways.append(rxn_pathways)
+            number_of_pathways += sum(len(pathways)
+                                      for _, pathways, _ in rxn_pathways)
+            if number_of_pathways >= _SENT_PATHWAYS:
+                connection.send((first_rxnidx, chunk_pathways))
+                first_rxnidx = rxnidx + 1
+                chunk_pathways = []
+                number_of_pathways = 0
+        if chunk_pathways:
+            connection.send((first_rxnidx, chunk_pathways))
+        connection.send(None)
+    connection.close()
@@ -0,0 +1,457 @@
+# -*- coding: utf-8 -*-
+
+from __future__ import absolute_import
+
+import os
+import itertools
+import sqlite3
+from collections import OrderedDict
+
+
+class MemoryTableStore(dict):
+    """
+    Pathway table held in memory. This is the default storage of the
+    pathway table of PathwayAssembler, and is a dictionary of dictionary
+    mapping every metabolite and pathway length to a dictionary, which maps
+    the reaction mask of every pathway to its input mask.
+    """
+
+    def cell_lengths(self):
+        """
+        Yields the metabolite, the pathway length and the number of pathways
+        of every entry of the table, in the order of insertion
+        """
+        for metab, cells in self.items():
+            for pathlen, cell in cells.items():
+                yield metab, pathlen, len(cell)
+
+    def restore(self, cell_sizes):
+        """
+        Keeps only the first pathways of every entry of the table.
+
+        Parameters
+        ----------
+        cell_sizes : dict
+            Dictionary of dictionary containing the number of pathways to be
+            kept for every metabolite and pathway length. Metabolites and
+            lengths which are not in it are removed
+        """
+        for metab in list(self):
+            if metab not in cell_sizes:
+                del self[metab]
+                continue
+            cells = self[metab]
+            for pathlen in list(cells):
+                if pathlen not in cell_sizes[metab]:
+                    del cells[pathlen]
+                elif len(cells[pathlen]) > cell_sizes[metab][pathlen]:
+                    cells[pathlen] = dict(itertools.islice(
+                        cells[pathlen].items(), cell_sizes[metab][pathlen]))
+
+    def changes_of_cells(self, changed_cells):
+        """
+        Returns the pathways added to the entries of the table, which are
+        applied to a copy of the table in another process by apply_changes.
+
+        Parameters
+        ----------
+        changed_cells : list
+            List of the metabolite, the pathway length and the number of
+            pathways in the copy, of every entry which has changed
+
+        Returns
+        -------
+        changes : list
+            List of the metabolite, the pathway length and the list of
+            pathways added, as pairs of reaction and input masks
+        """
+        return [(metab, pathlen, list(itertools.islice(
+            self[metab][pathlen].items(), previous_size, None)))
+            for metab, pathlen, previous_size in changed_cells]
+
+    def apply_changes(self, changes):
+        """
+        Adds the pathways returned by changes_of_cells to the table
+        """
+        for metab, pathlen, pathways in changes:
+            self.setdefault(metab, {}).setdefault(pathlen, {}).update(pathways)
+
+    def flush(self):
+        """Nothing has to be written, since the table is in memory"""
+
+    def close(self):
+        """Nothing has to be closed, since the table is in memory"""
+
+
+class SQLiteTableStore(object):
+    """
+    Pathway table stored in an SQLite file, so that the table can be larger
+    than the memory. The entries (metabolite, pathway length) of the table
+    which have been used recently are cached in memory, and the other
+    entries are written to the file and evicted from the cache.
+
+    Parameters
+    ----------
+    filename : str
+        Name of the SQLite file. An existing table in the file is removed
+    cache_size : int
+        Maximum number of pathways held in the cache. By default, it is set
+        to 1000000
+
+    Notes
+    -----
+    The store behaves like the dictionary of dictionary of MemoryTableStore,
+    for the operations used by PathwayAssembler. Since the entries of the
+    pathway table only grow, only the pathways added since an entry was
+    last written are appended to the file. Pathways in the file beyond the
+    number written for an entry are ignored and overwritten, so that the
+    store can be used from a checkpoint of PathwayAssembler, after the
+    calculations were stopped while a column was being filled.
+
+    The cached entries count the pathways added to them, so that the
+    entries used least recently are evicted as soon as the cache holds more
+    pathways than its size, also while a column is being filled. Only the
+    entry used last is kept when it is larger than the cache by itself.
+
+    The masks are stored as little-endian bytes. Processes created from
+    the process holding the store (see the n_jobs option of
+    PathwayAssembler) open their own connection to the file and only read
+    the table, hence the store is flushed before they are created, and
+    they are only sent the number of pathways written for the entries
+    which change (see changes_of_cells). The file uses write-ahead logging,
+    so that these processes can read while the pathways they found are
+    written.
+
+    Examples
+    --------
+    >>> store = SQLiteTableStore('pathway_table.sqlite')
+    >>> assembler = PathwayAssembler(G, seed_metabolites, table_store=store)
+    >>> assembler.run(20)
+    """
+
+    def __init__(self, filename, cache_size=1000000):
+        self.filename = filename
+        self.cache_size = cache_size
+        # Number of pathways written to the file for every entry, which
+        # also keeps the order of insertion of metabolites and lengths
+        self._written = OrderedDict()
+        # Cached entries, as [cell, number of pathways written], in the
+        # order of their last use
+        self._cache = OrderedDict()
+        self._cached_pathways = 0
+        self._views = {}
+        self._connection = None
+        self._pid = None
+        connection = self._connect()
+        # Write-ahead logging lets the processes read the table while new
+        # pathways are written to it
+        connection.execute('PRAGMA journal_mode=WAL')
+        connection.execute('DROP TABLE IF EXISTS pathways')
+        connection.execute('CREATE TABLE pathways (metab TEXT, pathlen INTEGER, '
+                           'seq INTEGER, rxnmask BLOB, inputmask BLOB, '
+                           'PRIMARY KEY (metab, pathlen, seq)) WITHOUT ROWID')
+        connection.commit()
+
+    def __getstate__(self):
+        self.flush()
+        state = self.__dict__.copy()
+        state['_cache'] = OrderedDict()
+        state['_cached_pathways'] = 0
+        state['_views'] = {}
+        state['_connection'] = None
+        state['_pid'] = None
+        return state
+
+    def __contains__(self, metab):
+        return metab in self._written
+
+    def __iter__(self):
+        return iter(self._written)
+
+    def __len__(self):
+        return len(self._written)
+
+    def __getitem__(self, metab):
+        if metab not in self._written:
+            raise KeyError(metab)
+        if metab not in self._views:
+            self._views[metab] = _MetaboliteCells(self, metab)
+        return self._views[metab]
+
+    def __setitem__(self, metab, cells):
+        if metab not in self._written:
+            self._written[metab] = OrderedDict()
+        for pathlen, cell in cells.items():
+            self._set_cell(metab, pathlen, cell)
+
+    def get(self, metab, default=None):
+        if metab in self._written:
+            return self[metab]
+        return default
+
+    def keys(self):
+        return self._written.keys()
+
+    def items(self):
+        for metab in self._written:
+            yield metab, self[metab]
+
+    def cell_lengths(self):
+        """
+        Yields the metabolite, the pathway length and the number of pathways
+        of every entry of the table, in the order of insertion
+        """
+        for metab, cells in self._written.items():
+            for pathlen, written in cells.items():
+                cached = self._cache.get((metab, pathlen))
+                yield metab, pathlen, written if cached is None else len(cached[0])
+
+    def flush(self):
+        """
+        Writes the pathways of the cached entries which have not been
+        written to the file
+        """
+        for (metab, pathlen), cached in self._cache.items():
+            self._write_cell(metab, pathlen, cached)
+        if self._connection is not None:
+            self._connection.commit()
+        # Entries grow while they are cached, hence the number of cached
+        # pathways is counted again
+        self._cached_pathways = sum(len(cached[0]) for cached in self._cache.values())
+        self._evict()
+
+    def restore(self, cell_sizes):
+        """
+        Keeps only the first pathways of every entry of the table. The
+        pathways removed are left in the file, where they are ignored.
+
+        Parameters
+        ----------
+        cell_sizes : dict
+            Dictionary of dictionary containing the number of pathways to be
+            kept for every metabolite and pathway length. Metabolites and
+            lengths which are not in it are removed
+        """
+        for metab in list(self._written):
+            if metab not in cell_sizes:
+                for pathlen in self._written[metab]:
+                    self._uncache((metab, pathlen))
+                del self._written[metab]
+                self._views.pop(metab, None)
+                continue
+            cells = self._written[metab]
+            for pathlen in list(cells):
+                if pathlen not in cell_sizes[metab]:
+                    self._uncache((metab, pathlen))
+                    del cells[pathlen]
+                else:
+                    cell_size = cell_sizes[metab][pathlen]
+                    cached = self._cache.get((metab, pathlen))
+                    if cached is not None and len(cached[0]) > cell_size:
+                        self._cached_pathways -= len(cached[0]) - cell_size
+                        cached[0] = _CachedCell(self, itertools.islice(
+                            cached[0].items(), cell_size))
+                        cached[1] = min(cached[1], cell_size)
+                    cells[pathlen] = min(cells[pathlen], cell_size)
+
+    def changes_of_cells(self, changed_cells):
+        """
+        Returns the number of pathways written for the entries of the table
+        which have changed. The pathways are read from the file by the copy
+        of the store in another process (see apply_changes), hence the
+        store is flushed first.
+
+        Parameters
+        ----------
+        changed_cells : list
+            List of the metabolite, the pathway length and the number of
+            pathways in the copy, of every entry which has changed
+
+        Returns
+        -------
+        changes : list
+            List of the metabolite, the pathway length and the number of
+            pathways written
+        """
+        self.flush()
+        return [(metab, pathlen, self._written[metab][pathlen])
+                for metab, pathlen, _ in changed_cells]
+
+    def apply_changes(self, changes):
+        """
+        Sets the number of pathways written for the entries returned by
+        changes_of_cells, and removes them from the cache, so that they are
+        read again from the file
+        """
+        for metab, pathlen, written in changes:
+            if metab not in self._written:
+                self._written[metab] = OrderedDict()
+            self._written[metab][pathlen] = written
+            self._uncache((metab, pathlen))
+
+    def _uncache(self, key):
+        """
+        Removes an entry from the cache without writing it
+        """
+        cached = self._cache.pop(key, None)
+        if cached is not None:
+            self._cached_pathways -= len(cached[0])
+
+    def close(self):
+        """
+        Writes the cached entries to the file and closes the connection
+        """
+        self.flush()
+        if self._connection is not None and self._pid == os.getpid():
+            self._connection.close()
+        self._connection = None
+
+    def _connect(self):
+        """
+        Returns the connection to the file, which is opened again in a new
+        process, since connections cannot be shared between processes
+        """
+        if self._connection is None or self._pid != os.getpid():
+            self._connection = sqlite3.connect(self.filename, timeout=60)
+            self._pid = os.getpid()
+        return self._connection
+
+    def _has_cell(self, metab, pathlen):
+        return pathlen in self._written[metab]
+
+    def _get_cell(self, metab, pathlen):
+        """
+        Returns the entry of the table, from the cache or from the file
+        """
+        key = (metab, pathlen)
+        cached = self._cache.get(key)
+        if cached is not None:
+            self._cache.move_to_end(key)
+            return cached[0]
+        written = self._written[metab][pathlen]
+        cell = _CachedCell(self)
+        if written:
+            for rxnmask, inputmask in self._connect().execute(
+                    'SELECT rxnmask, inputmask FROM pathways WHERE metab = ? '
+                    'AND pathlen = ? AND seq < ? ORDER BY seq',
+                    (metab, pathlen, written)):
+                dict.__setitem__(cell, int.from_bytes(rxnmask, 'little'),
+                                 int.from_bytes(inputmask, 'little'))
+        self._add_to_cache(key, [cell, written])
+        return cell
+
+    def _set_cell(self, metab, pathlen, cell):
+        """
+        Adds a new entry to the table
+        """
+        self._written[metab][pathlen] = 0
+        self._uncache((metab, pathlen))
+        self._add_to_cache((metab, pathlen), [_CachedCell(self, cell), 0])
+
+    def _cell_grown(self):
+        """
+        Counts a pathway added to a cached entry, and evicts the entries
+        used least recently if there are too many pathways in the cache
+        """
+        self._cached_pathways += 1
+        if self._cached_pathways > self.cache_size:
+            self._evict()
+
+    def _add_to_cache(self, key, cached):
+        """
+        Adds an entry to the cache, and evicts the entries used least
+        recently if there are too many pathways in the cache
+        """
+        self._cache[key] = cached
+        self._cached_pathways += len(cached[0])
+        self._evict()
+
+    def _evict(self):
+        """
+        Writes and removes the entries used least recently from the cache,
+        until the number of cached pathways is within the cache size
+        """
+        while self._cached_pathways > self.cache_size and len(self._cache) > 1:
+            (metab, pathlen), evicted = self._cache.popitem(last=False)
+            self._write_cell(metab, pathlen, evicted)
+            self._cached_pathways -= len(evicted[0])
+
+    def _write_cell(self, metab, pathlen, cached):
+        """
+        Appends the pathways of an entry which have not been written yet
+        """
+        cell, written = cached
+        if len(cell) > written:
+            self._connect().executemany(
+                'INSERT OR REPLACE INTO pathways VALUES (?, ?, ?, ?, ?)',
+                ((metab, pathlen, seq, _mask_to_bytes(rxnmask),
+                  _mask_to_bytes(inputmask))
+                 for seq, (rxnmask, inputmask) in enumerate(
+                     itertools.islice(cell.items(), written, None), written)))
+            cached[1] = len(cell)
+            self._written[metab][pathlen] = len(cell)
+
+
+class _CachedCell(dict):
+    """
+    Entry of the pathway table cached by SQLiteTableStore, which tells the
+    store about every pathway added to it
+    """
+    __slots__ = ('_store',)
+
+    def __init__(self, store, *args):
+        dict.__init__(self, *args)
+        self._store = store
+
+    def __setitem__(self, rxnmask, inputmask):
+        if rxnmask in self:
+            dict.__setitem__(self, rxnmask, inputmask)
+            return
+        dict.__setitem__(self, rxnmask, inputmask)
+        self._store._cell_grown()
+
+    def __reduce__(self):
+        return dict, (dict(self),)
+
+
+class _MetaboliteCells(object):
+    """
+    Entries of the pathway table of a metabolite in SQLiteTableStore
+    """
+
+    def __init__(self, store, metab):
+        self._store = store
+        self._metab = metab
+
+    def __contains__(self, pathlen):
+        return self._store._has_cell(self._metab, pathlen)
+
+    def __iter__(self):
+        return iter(list(self._store._written[self._metab]))
+
+    def __len__(self):
+        return len(self._store._written[self._metab])
+
+    def __getitem__(self, pathlen):
+        if not self._store._has_cell(self._metab, pathlen):
+            raise KeyError(pathlen)
+        return self._store._get_cell(self._metab, pathlen)
+
+    def __setitem__(self, pathlen, cell):
+        self._store._set_cell(self._metab, pathlen, cell)
+
+    def get(self, pathlen, default=None):
+        if self._store._has_cell(self._metab, pathlen):
+            return self._store._get_cell(self._metab, pathlen)
+        return default
+
+    def keys(self):
+        return list(self._store._written[self._metab])
+
+    def items(self):
+        for pathlen in list(self._store._written[self._metab]):
+            yield pathlen, self._store._get_cell(self._metab, pathlen)
+
+
+def _mask_to_bytes(mask):
+    return mask.to_bytes((mask.bit_length() + 7) // 8, 'little')
@@ -0,0 +1,110 @@
+import os
+import pickle
+import shutil
+from metquest import construct_graph
+from metquest import fetch_reactions
+from metquest import find_pathways
+from metquest import graph_cache
+
+models_dir = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+                          'MetQuest_tutorial_jupyter_notebook')
+data_dir = os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                        'example', 'data')
+file_names = [os.path.join(models_dir, filenames)
+              for filenames in ['iMM904.xml', 'pichia.xml']]
+
+
+def _graph_contents(G):
+    return dict(G.nodes(data=True)), set(G.edges())
+
+
+def test_n_jobs_is_forwarded_to_the_reading_of_the_models(monkeypatch):
+    segregate_reactions_from_models = \
+        fetch_reactions.segregate_reactions_from_models
+    n_jobs_used = []
+
+    def segregate_and_record(file_names, n_jobs=1):
+        n_jobs_used.append(n_jobs)
+        return segregate_reactions_from_models(file_names, n_jobs)
+
+    monkeypatch.setattr(fetch_reactions, 'segregate_reactions_from_models',
+                        segregate_and_record)
+    H, full_name_map = construct_graph.create_graph(file_names, 2)
+    parallel_H, parallel_full_name_map = construct_graph.create_graph(
+        file_names, 2, n_jobs=2)
+    iterated_graphs = list(construct_graph.iter_graphs(file_names, 2,
+                                                       n_jobs=2))
+    assert n_jobs_used == [1, 2, 2]
+    assert len(H) == len(parallel_H) == len(iterated_graphs) == 1
+    assert _graph_contents(parallel_H[0]) == _graph_contents(H[0])
+    assert parallel_full_name_map == full_name_map
+    combination, G, namemap = iterated_graphs[0]
+    assert _graph_contents(G) == _graph_contents(H[0])
+    assert dict(namemap) == full_name_map
+
+
+def test_prune_graph_keeps_the_pathways_of_the_remaining_metabolites():
+    with open(os.path.join(data_dir, 'iJO1366_.gpickle'), 'rb') as filetoread:
+        G = pickle.load(filetoread)
+    seed_metabolites = set()
+    for filenames in ['seed_mets.txt', 'source_mets.txt']:
+        with open(os.path.join(data_dir, filenames), 'r') as metfile:
+            seed_metabolites.update(metfile.read().splitlines())
+    pruned_graph, removed_reactions, removed_metabolites = \
+        construct_graph.prune_graph(G, seed_metabolites)
+    assert removed_reactions and removed_metabolites
+    for metab in pruned_graph.nodes():
+        if pruned_graph.nodes[metab]['bipartite'] == 0 \
+                and metab not in seed_metabolites:
+            assert list(pruned_graph.successors(metab))
+    pathway_table, cyclic_pathways, scope = find_pathways(
+        G, seed_metabolites, 8)
+    pruned_table, pruned_cyclic_pathways, pruned_scope = find_pathways(
+        pruned_graph, seed_metabolites, 8)
+    assert pruned_table == {metab: pathways for metab, pathways
+                            in pathway_table.items() if metab in pruned_graph}
+    assert pruned_cyclic_pathways == {
+        metab: pathways for metab, pathways in cyclic_pathways.items()
+        if metab in pruned_graph}
+    assert pruned_scope == scope & set(pruned_graph.nodes())
+    kept_graph, _, _ = construct_graph.prune_graph(
+        G, seed_metabolites, targets=set(pathway_table))
+    assert set(pathway_table) <= set(kept_graph.nodes())
+
+
+def test_graph_cache_key_depends_on_the_file_names(tmp_path):
+    copied_names = []
+    for dirnames in ['first', 'second']:
+        os.makedirs(str(tmp_path / dirnames))
+        copied_names.append(str(tmp_path / dirnames / 'pichia.xml'))
+        shutil.copyfile(file_names[1], copied_names[-1])
+    # Models without an ID are named after the file names, hence a moved
+    # model is not found in the cache
+    assert graph_cache.graph_cache_key(copied_names[:1], 1, False) != \
+        graph_cache.graph_cache_key(copied_names[1:], 1, False)
+    assert graph_cache.graph_cache_key(copied_names[:1], 1, False) == \
+        graph_cache.graph_cache_key(list(copied_names[:1]), 1, False)
+
+
+def test_iter_graphs_reads_only_the_models_of_the_combinations(monkeypatch):
+    segregate_reactions_from_models = \
+        fetch_reactions.segregate_reactions_from_models
+    files_read = []
+
+    def segregate_and_record(file_names, n_jobs=1):
+        files_read.append(list(file_names))
+        return segregate_reactions_from_models(file_names, n_jobs)
+
+    monkeypatch.setattr(fetch_reactions, 'segregate_reactions_from_models',
+                        segregate_and_record)
+    all_graphs = list(construct_graph.iter_graphs(file_names, 1))
+    some_graphs = list(construct_graph.iter_graphs(file_names, 1,
+                                                   combination_indices=[1]))
+    assert files_read == [file_names, file_names[1:]]
+    assert len(all_graphs) == 2 and len(some_graphs) == 1
+    combination, G, namemap = some_graphs[0]
+    assert combination == all_graphs[1][0]
+    assert _graph_contents(G) == _graph_contents(all_graphs[1][1])
+    for rxn, attributes in G.nodes(data=True):
+        if attributes['bipartite'] == 1:
+            assert namemap[rxn] == all_graphs[1][2][rxn]
@@ -0,0 +1,75 @@
+import os
+import pickle
+from metquest import PathwayAssembler, SQLiteTableStore, count_pathways
+from metquest import find_pathways
+
+data_dir = os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                        'example', 'data')
+
+
+def _load_example():
+    with open(os.path.join(data_dir, 'iJO1366_.gpickle'), 'rb') as filetoread:
+        G = pickle.load(filetoread)
+    seed_metabolites = set()
+    for filenames in ['seed_mets.txt', 'source_mets.txt']:
+        with open(os.path.join(data_dir, filenames), 'r') as metfile:
+            seed_metabolites.update(metfile.read().splitlines())
+    return G, seed_metabolites
+
+
+def test_count_pathways_keeps_only_the_input_masks_combined_later():
+    G, seed_metabolites = _load_example()
+    path_len_cutoff = 8
+    assembler = PathwayAssembler(G, seed_metabolites)
+    assembler.run(path_len_cutoff)
+    assert count_pathways(G, seed_metabolites, path_len_cutoff) == \
+        assembler.get_pathway_counts()
+    counting_assembler = PathwayAssembler(G, seed_metabolites)
+    counting_assembler.count_pathways(path_len_cutoff)
+    for metab, cells in counting_assembler._pathway_table.items():
+        for pathlen, cell in cells.items():
+            stored_cell = assembler._pathway_table[metab][pathlen]
+            assert list(cell) == list(stored_cell)
+            if pathlen >= path_len_cutoff:
+                assert not any(cell.values())
+            else:
+                assert cell == stored_cell
+    counting_assembler.run(path_len_cutoff + 1)
+    assert counting_assembler.completed_column == path_len_cutoff
+
+
+def test_processes_fill_the_same_tables(tmp_path):
+    G, seed_metabolites = _load_example()
+    path_len_cutoff = 9
+    assembler = PathwayAssembler(G, seed_metabolites)
+    assembler.run(path_len_cutoff)
+    store = SQLiteTableStore(str(tmp_path / 'pathway_table.sqlite'),
+                             cache_size=1000)
+    for table_store in [None, store]:
+        parallel_assembler = PathwayAssembler(G, seed_metabolites, n_jobs=2,
+                                              table_store=table_store)
+        # The processes are started again when the calculations resume
+        parallel_assembler.run(path_len_cutoff - 2)
+        parallel_assembler.run(path_len_cutoff)
+        assert parallel_assembler.get_pathway_table() == \
+            assembler.get_pathway_table()
+        assert parallel_assembler.get_cyclic_pathways() == \
+            assembler.get_cyclic_pathways()
+    store.close()
+
+
+def test_find_pathways_returns_the_incomplete_column_if_asked():
+    G, seed_metabolites = _load_example()
+    pathway_table, cyclic_pathways, scope = find_pathways(
+        G, seed_metabolites, 4)
+    assert find_pathways(G, seed_metabolites, 4,
+                         return_incomplete_column=True) == \
+        (pathway_table, cyclic_pathways, scope, None)
+    # The limit is reached as soon as the second column is filled
+    limited_results = find_pathways(G, seed_metabolites, 4, time_limit=0)
+    assert len(limited_results) == 3
+    limited_table, _, _, incomplete_column = find_pathways(
+        G, seed_metabolites, 4, time_limit=0, return_incomplete_column=True)
+    assert incomplete_column == 2
+    assert limited_table == limited_results[0]
+    assert all(max(cells) <= 1 for cells in limited_table.values())
@@ -0,0 +1,50 @@
+import os
+import pickle
+from metquest import PathwayAssembler, SQLiteTableStore
+from metquest import table_store
+
+data_dir = os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                        'example', 'data')
+
+
+def _load_example():
+    with open(os.path.join(data_dir, 'iJO1366_.gpickle'), 'rb') as filetoread:
+        G = pickle.load(filetoread)
+    seed_metabolites = set()
+    for filenames in ['seed_mets.txt', 'source_mets.txt']:
+        with open(os.path.join(data_dir, filenames), 'r') as metfile:
+            seed_metabolites.update(metfile.read().splitlines())
+    return G, seed_metabolites
+
+
+def test_sqlite_cache_size_is_enforced(tmp_path, monkeypatch):
+    G, seed_metabolites = _load_example()
+    path_len_cutoff = 8
+    assembler = PathwayAssembler(G, seed_metabolites)
+    assembler.run(path_len_cutoff)
+    pathway_table = assembler.get_pathway_table()
+    cell_sizes = [len(cell) for cells in pathway_table.values()
+                  for cell in cells.values()]
+    # A single entry larger than the cache is kept while it is used, hence
+    # the cache must be able to hold the largest entry
+    cache_size = max(cell_sizes) + 100
+    assert sum(cell_sizes) > 2 * cache_size
+    store = SQLiteTableStore(str(tmp_path / 'pathway_table.sqlite'),
+                             cache_size=cache_size)
+    largest_cache = [0]
+    add_pathway = table_store._CachedCell.__setitem__
+
+    def add_pathway_and_check(cell, rxnmask, inputmask):
+        add_pathway(cell, rxnmask, inputmask)
+        cached_pathways = sum(len(cached[0]) for cached in store._cache.values())
+        assert cached_pathways == store._cached_pathways
+        largest_cache[0] = max(largest_cache[0], cached_pathways)
+
+    monkeypatch.setattr(table_store._CachedCell, '__setitem__',
+                        add_pathway_and_check)
+    stored_assembler = PathwayAssembler(G, seed_metabolites, table_store=store)
+    stored_assembler.run(path_len_cutoff)
+    assert 0 < largest_cache[0] <= cache_size
+    assert stored_assembler.get_pathway_table() == pathway_table
+    assert stored_assembler.get_cyclic_pathways() == assembler.get_cyclic_pathways()
+    store.close()